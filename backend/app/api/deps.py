@@ -1,5 +1,5 @@
 from fastapi import Depends
-from supabase import Client
+from supabase import AsyncClient
 
 from app.core.supabase import get_db
 from app.core.security import get_current_user
@@ -10,6 +10,6 @@ async def get_current_user_id(user: dict = Depends(get_current_user)) -> str:
     return user["id"]
 
 
-async def get_db_client() -> Client:
+async def get_db_client() -> AsyncClient:
     """Get database client."""
     return get_db()
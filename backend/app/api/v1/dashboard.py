@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, Query, Response
+
+from app.api.deps import get_current_user_id, get_db_client
+from app.config import get_settings
+from app.models.dashboard import Dashboard
+from app.models.common import DataResponse
+from app.services.dashboard_service import DashboardService
+
+router = APIRouter()
+
+
+@router.get("", response_model=DataResponse[Dashboard])
+async def get_dashboard(
+    response: Response,
+    period: str = "month",  # week, month, year
+    recent_limit: int = Query(5, ge=1, le=50),
+    user_id: str = Depends(get_current_user_id),
+    db=Depends(get_db_client),
+):
+    """Get the spending summary, budget status, recent expenses and goals at once."""
+    service = DashboardService(db)
+    result, timings = await service.get_dashboard(user_id, period, recent_limit)
+
+    # Per-section timings for browser dev tools, in debug mode only
+    if get_settings().debug:
+        response.headers["Server-Timing"] = ", ".join(
+            f"{name};dur={ms:.1f}" for name, ms in timings.items()
+        )
+    return DataResponse(data=result)
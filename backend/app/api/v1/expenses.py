@@ -1,5 +1,7 @@
-from fastapi import APIRouter, Depends, Query
-from typing import Optional
+from fastapi import APIRouter, Depends, File, Query, Request, UploadFile
+from typing import Literal, Optional
+import csv
+import io
 
 from app.api.deps import get_current_user_id, get_db_client
 from app.models.expense import (
@@ -7,9 +9,14 @@ from app.models.expense import (
     ExpenseUpdate,
     ExpenseResponse,
     ExpenseFilters,
+    ExpenseImportResult,
+    ExpenseBatchUpdate,
+    ExpenseBatchDelete,
+    ExpenseBatchResult,
 )
 from app.models.common import DataResponse, PaginatedResponse
 from app.services.expense_service import ExpenseService
+from app.core.exceptions import BadRequestException
 
 router = APIRouter()
 
@@ -25,6 +32,13 @@ async def list_expenses(
     max_amount: Optional[float] = None,
     search: Optional[str] = None,
     payment_method: Optional[str] = None,
+    cursor: Optional[str] = Query(
+        None,
+        description="Keyset cursor from next_cursor; pass an empty value for the first page",
+    ),
+    count: Literal["exact", "planned", "estimated"] = Query(
+        "exact", description="How the total is counted"
+    ),
     user_id: str = Depends(get_current_user_id),
     db=Depends(get_db_client),
 ):
@@ -40,7 +54,9 @@ async def list_expenses(
     )
 
     service = ExpenseService(db)
-    return await service.list_expenses(user_id, page, limit, filters)
+    return await service.list_expenses(
+        user_id, page, limit, filters, cursor, count
+    )
 
 
 @router.post("", response_model=DataResponse[ExpenseResponse])
@@ -55,6 +71,69 @@ async def create_expense(
     return DataResponse(data=result, message="Expense created successfully")
 
 
+@router.post("/bulk", response_model=DataResponse[ExpenseImportResult])
+async def bulk_create_expenses(
+    request: Request,
+    file: Optional[UploadFile] = File(
+        None, description="CSV with a header row of expense fields"
+    ),
+    user_id: str = Depends(get_current_user_id),
+    db=Depends(get_db_client),
+):
+    """Import expenses from a JSON array body or an uploaded CSV file."""
+    if file is not None:
+        rows = csv.DictReader(io.TextIOWrapper(file.file, encoding="utf-8-sig", newline=""))
+    else:
+        try:
+            rows = await request.json()
+        except ValueError:
+            raise BadRequestException("Send a JSON array of expenses or a CSV file")
+        if not isinstance(rows, list):
+            raise BadRequestException("Send a JSON array of expenses or a CSV file")
+
+    service = ExpenseService(db)
+    try:
+        result = await service.bulk_create_expenses(user_id, rows)
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise BadRequestException(f"Could not read CSV file: {e}")
+
+    return DataResponse(
+        data=result,
+        message=f"Imported {result.inserted} expenses, {result.failed} rejected",
+    )
+
+
+# Declared before /{expense_id} so "batch" is not taken for an id
+@router.patch("/batch", response_model=DataResponse[ExpenseBatchResult])
+async def update_expenses(
+    batch: ExpenseBatchUpdate,
+    user_id: str = Depends(get_current_user_id),
+    db=Depends(get_db_client),
+):
+    """Apply the same changes to several expenses."""
+    service = ExpenseService(db)
+    ids = await service.update_expenses(user_id, batch.ids, batch.patch)
+    return DataResponse(
+        data=ExpenseBatchResult(ids=ids),
+        message=f"{len(ids)} expenses updated successfully",
+    )
+
+
+@router.delete("/batch", response_model=DataResponse[ExpenseBatchResult])
+async def delete_expenses(
+    batch: ExpenseBatchDelete,
+    user_id: str = Depends(get_current_user_id),
+    db=Depends(get_db_client),
+):
+    """Delete several expenses."""
+    service = ExpenseService(db)
+    ids = await service.delete_expenses(user_id, batch.ids)
+    return DataResponse(
+        data=ExpenseBatchResult(ids=ids),
+        message=f"{len(ids)} expenses deleted successfully",
+    )
+
+
 @router.get("/{expense_id}", response_model=DataResponse[ExpenseResponse])
 async def get_expense(
     expense_id: str,
@@ -1,4 +1,10 @@
-from fastapi import APIRouter, Depends
+import json
+import logging
+from datetime import datetime
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 
 from app.api.deps import get_current_user_id, get_db_client
 from app.models.insight import (
@@ -11,9 +17,32 @@ from app.models.insight import (
 from app.models.common import DataResponse
 from app.services.insight_service import InsightService
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _chat_events(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Format a chat reply stream as Server-Sent Events.
+
+    When the client disconnects the response task is cancelled, and closing
+    the chunk stream here ends the Gemini request with it.
+    """
+    try:
+        async for text in chunks:
+            yield _sse_event("token", {"text": text})
+        yield _sse_event("done", {"timestamp": datetime.now().isoformat()})
+    except Exception:
+        logger.exception("Chat stream failed")
+        yield _sse_event("error", {"message": "Failed to get chat response"})
+    finally:
+        await chunks.aclose()
+
+
 @router.get("/summary", response_model=DataResponse[SpendingSummary])
 async def get_spending_summary(
     period: str = "month",  # week, month, year
@@ -28,12 +57,13 @@ async def get_spending_summary(
 
 @router.get("/tips", response_model=DataResponse[list[AIInsight]])
 async def get_spending_tips(
+    refresh: bool = Query(False, description="Generate new tips instead of reusing cached ones"),
     user_id: str = Depends(get_current_user_id),
     db=Depends(get_db_client),
 ):
     """Get AI-generated spending tips based on user's financial data."""
     service = InsightService(db)
-    result = await service.get_spending_tips(user_id)
+    result = await service.get_spending_tips(user_id, refresh)
     return DataResponse(data=result)
 
 
@@ -49,6 +79,22 @@ async def chat_with_ai(
     return DataResponse(data=result)
 
 
+@router.post("/chat/stream")
+async def stream_chat_with_ai(
+    request: ChatRequest,
+    user_id: str = Depends(get_current_user_id),
+    db=Depends(get_db_client),
+):
+    """Chat with AI about finances, streaming the reply as Server-Sent Events."""
+    service = InsightService(db)
+    chunks = await service.chat_stream(user_id, request.message, request.history)
+    return StreamingResponse(
+        _chat_events(chunks),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/predictions", response_model=DataResponse[SpendingPrediction])
 async def get_spending_predictions(
     user_id: str = Depends(get_current_user_id),
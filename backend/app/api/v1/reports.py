@@ -37,19 +37,19 @@ async def get_category_report(
 
 @router.get("/export")
 async def export_data(
-    format: str = Query("csv", description="Export format (csv or pdf)"),
+    format: str = Query("csv", description="Export format (csv, pdf, parquet or arrow)"),
     start_date: str = Query(..., description="Start date (YYYY-MM-DD)"),
     end_date: str = Query(..., description="End date (YYYY-MM-DD)"),
     user_id: str = Depends(get_current_user_id),
     db=Depends(get_db_client),
 ):
-    """Export financial data as CSV or PDF."""
+    """Export financial data as CSV, PDF, Parquet or Arrow IPC."""
     service = ReportService(db)
 
     if format == "csv":
-        content, filename = await service.export_csv(user_id, start_date, end_date)
+        chunks, filename = service.export_csv(user_id, start_date, end_date)
         return StreamingResponse(
-            iter([content]),
+            chunks,
             media_type="text/csv",
             headers={"Content-Disposition": f"attachment; filename={filename}"},
         )
@@ -60,5 +60,18 @@ async def export_data(
             media_type="application/pdf",
             headers={"Content-Disposition": f"attachment; filename={filename}"},
         )
+    elif format in ("parquet", "arrow"):
+        chunks, filename = service.export_columnar(user_id, start_date, end_date, format)
+        return StreamingResponse(
+            chunks,
+            media_type=(
+                "application/vnd.apache.parquet"
+                if format == "parquet"
+                else "application/vnd.apache.arrow.stream"
+            ),
+            headers={"Content-Disposition": f"attachment; filename={filename}"},
+        )
     else:
-        return DataResponse(data=None, message="Invalid format. Use 'csv' or 'pdf'")
+        return DataResponse(
+            data=None, message="Invalid format. Use 'csv', 'pdf', 'parquet' or 'arrow'"
+        )
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1 import expenses, budgets, goals, insights, reports, categories
+from app.api.v1 import expenses, budgets, goals, insights, reports, categories, dashboard
 
 api_router = APIRouter()
 
@@ -39,3 +39,9 @@ api_router.include_router(
     prefix="/categories",
     tags=["Categories"]
 )
+
+api_router.include_router(
+    dashboard.router,
+    prefix="/dashboard",
+    tags=["Dashboard"]
+)
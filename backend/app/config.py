@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
+from typing import Literal
 
 
 class Settings(BaseSettings):
@@ -18,8 +19,76 @@ class Settings(BaseSettings):
     supabase_url: str = ""
     supabase_service_key: str = ""
 
+    # Auth settings
+    # "remote" asks the Supabase auth server on every request,
+    # "local" verifies the JWT in-process (signature, expiry, audience, issuer)
+    auth_verify_mode: Literal["remote", "local"] = "remote"
+    supabase_jwt_secret: str = ""
+    jwt_audience: str = "authenticated"
+    jwt_leeway_seconds: int = 10
+    jwks_refresh_interval: int = 600
+
+    # PostgREST HTTP transport
+    postgrest_pool_max_connections: int = 50
+    postgrest_pool_max_keepalive: int = 20
+    postgrest_keepalive_expiry: float = 30.0
+    postgrest_http2: bool = True
+    postgrest_connect_timeout: float = 5.0
+    postgrest_read_timeout: float = 30.0
+    postgrest_pool_timeout: float = 10.0
+    postgrest_get_retries: int = 2
+
+    # Serve report and budget aggregates from the daily_spend rollup
+    use_daily_spend_rollup: bool = False
+
+    # Expense description search: ranked full-text/trigram RPC or plain ilike
+    expense_search_backend: Literal["fulltext", "ilike"] = "fulltext"
+
+    # Bulk expense import
+    bulk_insert_chunk_size: int = 500
+    bulk_import_max_rows: int = 10000
+
+    # Batch update/delete; ids travel in the query string, so keep URLs short
+    expense_batch_max_size: int = 200
+
+    # Rows fetched per page when streaming exports
+    export_page_size: int = 1000
+
+    # Worker processes for CPU-bound rendering (PDF export) and how many
+    # jobs may wait for one before new requests are turned away
+    render_pool_workers: int = 2
+    render_pool_max_waiting: int = 16
+
+    # In-process result caches; data versions are tracked per user
+    cache_max_tracked_users: int = 100000
+    report_cache_max_entries: int = 2048
+    report_cache_ttl_seconds: float = 300.0
+    summary_cache_max_entries: int = 4096
+    summary_cache_ttl_seconds: float = 60.0
+    summary_cache_stale_seconds: float = 600.0
+    tips_cache_max_entries: int = 4096
+    tips_cache_ttl_seconds: float = 3600.0
+
+    # Identical concurrent service reads share one call; cap on keys tracked
+    singleflight_max_keys: int = 10000
+
+    # Spending forecasts: months of history fitted, whether series with two
+    # full years may use a seasonal model, and the prediction interval level
+    forecast_history_months: int = 24
+    forecast_seasonal: bool = True
+    forecast_interval: float = 0.8
+
     # Gemini API settings
     gemini_api_key: str = ""
+    gemini_base_url: str = ""
+    gemini_timeout_seconds: float = 30.0
+    gemini_max_concurrency: int = 8
+    gemini_max_retries: int = 2
+
+    # Chat history: recent user/assistant pairs sent verbatim, older turns
+    # summarised, all within a token budget
+    chat_recent_turns: int = 6
+    chat_history_token_budget: int = 2000
 
     # CORS settings
     cors_origins: str = "http://localhost:3000"
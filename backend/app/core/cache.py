@@ -0,0 +1,170 @@
+"""In-process result caches with LRU/TTL eviction and per-user data versions.
+
+Cached results are keyed by the user's data version, which every write to
+their expenses, categories, budgets or goals bumps, so a read after a
+write never sees a result computed before it. Versions live in this process only; with
+several workers a write is seen by the others once the entry's TTL ends.
+"""
+import asyncio
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+from app.config import get_settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries also expire after a fixed TTL."""
+
+    def __init__(self, name: str, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._hits = metrics.counter(f"{name}_cache_hits_total", f"{name} cache hits")
+        self._misses = metrics.counter(f"{name}_cache_misses_total", f"{name} cache misses")
+        self._evictions = metrics.counter(
+            f"{name}_cache_evictions_total", f"{name} cache entries evicted to stay within size"
+        )
+        self._hit_ratio = metrics.gauge(
+            f"{name}_cache_hit_ratio", f"Share of {name} cache lookups that hit"
+        )
+        self._size = metrics.gauge(f"{name}_cache_entries", f"{name} cache entries held")
+
+    def get(self, key: Hashable) -> Any | None:
+        """Return the live value for key, or None on a miss."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self._record(hit=True)
+            return entry[1]
+
+        if entry is not None:
+            del self._entries[key]
+            self._size.set(len(self._entries))
+        self._record(hit=False)
+        return None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value for key, evicting the least recently used entries."""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions.inc()
+        self._size.set(len(self._entries))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size.set(0)
+
+    def _record(self, hit: bool) -> None:
+        (self._hits if hit else self._misses).inc()
+        lookups = self._hits.value + self._misses.value
+        self._hit_ratio.set(round(self._hits.value / lookups, 4))
+
+
+class StaleWhileRevalidateCache:
+    """Bounded cache that keeps serving expired entries while refreshing them.
+
+    Entries are fresh for ttl_seconds. For stale_seconds after that they are
+    still returned at once while a single background task recomputes them;
+    only missing or fully expired entries make the caller wait.
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl_seconds: float, stale_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        # key -> (fresh until, stale until, value, seconds it took to compute)
+        self._entries: OrderedDict[Hashable, tuple[float, float, Any, float]] = OrderedDict()
+        self._refreshing: dict[Hashable, asyncio.Task] = {}
+        self._hits = metrics.counter(f"{name}_cache_hits_total", f"{name} cache fresh hits")
+        self._stale_hits = metrics.counter(
+            f"{name}_cache_stale_hits_total", f"{name} cache hits served stale while refreshing"
+        )
+        self._misses = metrics.counter(f"{name}_cache_misses_total", f"{name} cache misses")
+        self._refresh_errors = metrics.counter(
+            f"{name}_cache_refresh_errors_total", f"{name} background refreshes that failed"
+        )
+        self._saved = metrics.summary(
+            f"{name}_cache_saved_seconds", f"Computation time a {name} cache hit avoided"
+        )
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, computing it on a miss."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            fresh_until, stale_until, value, cost = entry
+            now = time.monotonic()
+            if now < stale_until:
+                self._entries.move_to_end(key)
+                self._saved.observe(cost)
+                if now < fresh_until:
+                    self._hits.inc()
+                else:
+                    self._stale_hits.inc()
+                    self._schedule_refresh(key, compute)
+                return value
+            del self._entries[key]
+
+        self._misses.inc()
+        return await self._compute(key, compute)
+
+    async def _compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.perf_counter()
+        value = await compute()
+        cost = time.perf_counter() - started
+
+        fresh_until = time.monotonic() + self.ttl_seconds
+        self._entries[key] = (fresh_until, fresh_until + self.stale_seconds, value, cost)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def _schedule_refresh(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> None:
+        if key not in self._refreshing:
+            self._refreshing[key] = asyncio.create_task(self._refresh(key, compute))
+
+    async def _refresh(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            await self._compute(key, compute)
+        except Exception:
+            # Keep serving the stale value; the next stale hit retries
+            self._refresh_errors.inc()
+            logger.warning("Background cache refresh failed for %r", key, exc_info=True)
+        finally:
+            self._refreshing.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# Versions come from one process-wide counter, so a user whose version was
+# dropped from the table gets a number no cached entry was ever keyed on
+_version_counter = itertools.count(1)
+_data_versions: OrderedDict[str, int] = OrderedDict()
+
+
+def get_data_version(user_id: str) -> int:
+    """Current version of a user's expense data."""
+    version = _data_versions.get(user_id)
+    if version is None:
+        return bump_data_version(user_id)
+    _data_versions.move_to_end(user_id)
+    return version
+
+
+def bump_data_version(user_id: str) -> int:
+    """Invalidate every cached result derived from a user's data."""
+    version = next(_version_counter)
+    _data_versions[user_id] = version
+    _data_versions.move_to_end(user_id)
+    while len(_data_versions) > get_settings().cache_max_tracked_users:
+        _data_versions.popitem(last=False)
+    return version
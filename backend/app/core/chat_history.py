@@ -0,0 +1,96 @@
+"""Token-budgeted chat history for Gemini prompts.
+
+The client sends the whole conversation with every chat turn. Only the
+most recent turns are passed to the model verbatim; older ones are folded
+into a short extractive summary, so the prompt stays within a fixed budget
+however long the conversation runs. The summary is rebuilt from the
+history on each turn and rolls forward as turns age out of the recent
+window.
+"""
+import math
+import re
+
+from app.config import get_settings
+from app.core.metrics import metrics
+
+# Average characters per Gemini token for English text, used for budgeting
+CHARS_PER_TOKEN = 4
+
+# Longest excerpt kept from a single folded message
+SUMMARY_LINE_CHARS = 160
+
+# Share of the history budget the summary of older turns may use
+SUMMARY_BUDGET_SHARE = 0.25
+
+history_tokens = metrics.summary(
+    "chat_history_tokens", "Estimated tokens of chat history sent with each turn"
+)
+history_tokens_saved = metrics.summary(
+    "chat_history_tokens_saved", "Estimated history tokens each turn saved by compaction"
+)
+history_folded = metrics.counter(
+    "chat_history_folded_messages_total", "Older chat messages folded into the summary"
+)
+
+_sentence_end = re.compile(r"(?<=[.!?])\s")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate Gemini token count without a round trip to the API."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _messages_tokens(messages: list[dict]) -> int:
+    return sum(estimate_tokens(m["content"]) for m in messages)
+
+
+def _summary_line(message: dict) -> str:
+    speaker = "User" if message["role"] == "user" else "Assistant"
+    text = " ".join(message["content"].split())
+    excerpt = _sentence_end.split(text, maxsplit=1)[0]
+    if len(excerpt) > SUMMARY_LINE_CHARS:
+        excerpt = excerpt[: SUMMARY_LINE_CHARS - 3].rstrip() + "..."
+    return f"- {speaker}: {excerpt}"
+
+
+def summarize_messages(messages: list[dict], max_tokens: int) -> str:
+    """First sentence of each message, dropping the oldest to fit max_tokens."""
+    lines = [_summary_line(m) for m in messages]
+    while lines and estimate_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    if not lines:
+        return ""
+    omitted = "- (earlier messages omitted)\n" if len(lines) < len(messages) else ""
+    return "Summary of our earlier conversation:\n" + omitted + "\n".join(lines)
+
+
+def compact_history(messages: list[dict]) -> tuple[str, list[dict]]:
+    """Split a conversation into a summary of older turns and recent messages.
+
+    The last message is always kept verbatim. Of the history before it, the
+    last chat_recent_turns user/assistant pairs are kept as long as they fit
+    the token budget; everything older is summarised. Returns the summary
+    ("" when nothing was folded) and the messages to send in full.
+    """
+    settings = get_settings()
+    *history, latest = messages
+    budget = settings.chat_history_token_budget
+    summary_budget = int(budget * SUMMARY_BUDGET_SHARE)
+
+    split = max(len(history) - settings.chat_recent_turns * 2, 0)
+    # Fold further back when the recent turns alone overflow the budget,
+    # keeping the recent window starting on a user message
+    while split < len(history) and (
+        history[split]["role"] != "user"
+        or _messages_tokens(history[split:]) > budget - (summary_budget if split else 0)
+    ):
+        split += 1
+
+    older, recent = history[:split], history[split:]
+    summary = summarize_messages(older, summary_budget) if older else ""
+
+    sent = estimate_tokens(summary) + _messages_tokens(recent)
+    history_tokens.observe(sent)
+    history_tokens_saved.observe(max(_messages_tokens(history) - sent, 0))
+    history_folded.inc(len(older))
+    return summary, recent + [latest]
@@ -1,47 +1,205 @@
+import asyncio
+import logging
+import random
+import time
+from typing import AsyncIterator
+
+import httpx
 from google import genai
-from google.genai import types
+from google.genai import errors, types
 from functools import lru_cache
 
 from app.config import get_settings
+from app.core.chat_history import compact_history
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+GEMINI_MODEL = "gemini-2.0-flash"
+
+# Rate limiting and server-side failures; other API errors are not retried
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# Caps model calls in flight across all requests in this process
+_semaphore: asyncio.Semaphore | None = None
+
+gemini_in_flight = metrics.gauge("gemini_in_flight", "Gemini calls currently in flight")
+gemini_request_seconds = metrics.summary(
+    "gemini_request_seconds", "Duration of individual Gemini call attempts"
+)
+gemini_retries = metrics.counter("gemini_retries_total", "Gemini calls retried after a transient error")
+gemini_timeouts = metrics.counter("gemini_timeouts_total", "Gemini call attempts that timed out")
+gemini_prompt_tokens = metrics.summary("gemini_prompt_tokens", "Prompt tokens billed per Gemini call")
+gemini_cached_prompt_tokens = metrics.summary(
+    "gemini_cached_prompt_tokens", "Prompt tokens per Gemini call served from implicit caching"
+)
 
 
 @lru_cache()
 def get_gemini_client():
     """Get Gemini client instance (singleton)."""
     settings = get_settings()
-    client = genai.Client(api_key=settings.gemini_api_key)
+    http_options = {"timeout": int(settings.gemini_timeout_seconds * 1000)}
+    if settings.gemini_base_url:
+        http_options["base_url"] = settings.gemini_base_url
+    client = genai.Client(
+        api_key=settings.gemini_api_key,
+        http_options=types.HttpOptions(**http_options),
+    )
     return client
 
 
-def get_generation_config():
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(get_settings().gemini_max_concurrency)
+    return _semaphore
+
+
+def _is_transient(error: Exception) -> bool:
+    """Timeouts, dropped connections and retryable HTTP statuses."""
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    # OSError covers TimeoutError and the SDK's requests-based connection errors
+    return isinstance(error, (OSError, httpx.TransportError))
+
+
+def get_generation_config(**overrides):
     """Get generation configuration."""
     return types.GenerateContentConfig(
         temperature=0.7,
         top_p=0.95,
         top_k=40,
         max_output_tokens=1024,
+        **overrides,
     )
 
 
-async def generate_insight(prompt: str) -> str:
-    """Generate insight using Gemini API."""
+def _record_usage(usage: types.GenerateContentResponseUsageMetadata | None) -> None:
+    if usage is None or usage.prompt_token_count is None:
+        return
+    gemini_prompt_tokens.observe(usage.prompt_token_count)
+    gemini_cached_prompt_tokens.observe(usage.cached_content_token_count or 0)
+    logger.debug(
+        "Gemini prompt tokens: %s (%s cached)",
+        usage.prompt_token_count,
+        usage.cached_content_token_count or 0,
+    )
+
+
+async def generate_content(contents, config: types.GenerateContentConfig | None = None) -> str:
+    """Call Gemini without blocking the event loop.
+
+    Each attempt holds a slot of the global concurrency cap and is bounded
+    by the configured timeout; transient failures are retried with
+    jittered exponential backoff.
+    """
+    settings = get_settings()
+    client = get_gemini_client()
+    attempt = 0
+
+    while True:
+        async with _get_semaphore():
+            started = time.perf_counter()
+            gemini_in_flight.inc()
+            try:
+                response = await asyncio.wait_for(
+                    client.aio.models.generate_content(
+                        model=GEMINI_MODEL,
+                        contents=contents,
+                        config=config or get_generation_config(),
+                    ),
+                    timeout=settings.gemini_timeout_seconds,
+                )
+                _record_usage(response.usage_metadata)
+                return response.text
+            except Exception as e:
+                if isinstance(e, TimeoutError):
+                    gemini_timeouts.inc()
+                if not _is_transient(e) or attempt >= settings.gemini_max_retries:
+                    raise
+            finally:
+                gemini_in_flight.dec()
+                gemini_request_seconds.observe(time.perf_counter() - started)
+
+        attempt += 1
+        gemini_retries.inc()
+        await asyncio.sleep(random.uniform(0, 0.5 * 2**attempt))
+
+
+async def stream_content(
+    contents, config: types.GenerateContentConfig | None = None
+) -> AsyncIterator[str]:
+    """Stream Gemini output as text chunks.
+
+    The stream holds a slot of the concurrency cap until it ends or the
+    consumer closes it, which also closes the upstream response. The
+    timeout bounds the wait for each chunk. Failures before the first text
+    chunk are retried like generate_content; later ones are raised as is.
+    """
+    settings = get_settings()
     client = get_gemini_client()
+    attempt = 0
+
+    while True:
+        async with _get_semaphore():
+            started = time.perf_counter()
+            gemini_in_flight.inc()
+            stream = None
+            yielded = False
+            try:
+                async with asyncio.timeout(settings.gemini_timeout_seconds):
+                    stream = await client.aio.models.generate_content_stream(
+                        model=GEMINI_MODEL,
+                        contents=contents,
+                        config=config or get_generation_config(),
+                    )
+                usage = None
+                while True:
+                    try:
+                        async with asyncio.timeout(settings.gemini_timeout_seconds):
+                            chunk = await anext(stream)
+                    except StopAsyncIteration:
+                        _record_usage(usage)
+                        return
+                    usage = chunk.usage_metadata or usage
+                    if chunk.text:
+                        yielded = True
+                        yield chunk.text
+            except Exception as e:
+                if isinstance(e, TimeoutError):
+                    gemini_timeouts.inc()
+                if yielded or not _is_transient(e) or attempt >= settings.gemini_max_retries:
+                    raise
+            finally:
+                if stream is not None:
+                    await stream.aclose()
+                gemini_in_flight.dec()
+                gemini_request_seconds.observe(time.perf_counter() - started)
+
+        attempt += 1
+        gemini_retries.inc()
+        await asyncio.sleep(random.uniform(0, 0.5 * 2**attempt))
 
+
+async def generate_insight(prompt: str) -> str:
+    """Generate insight using Gemini API."""
     try:
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=prompt,
-            config=get_generation_config(),
-        )
-        return response.text
+        return await generate_content(prompt)
     except Exception as e:
         raise Exception(f"Failed to generate insight: {str(e)}")
 
 
-async def chat_with_ai(messages: list[dict], user_context: str) -> str:
-    """Chat with AI about finances."""
-    client = get_gemini_client()
+def build_chat_request(
+    messages: list[dict], user_context: str
+) -> tuple[list[types.Content], types.GenerateContentConfig]:
+    """Build the contents and config sent to Gemini for a chat turn.
 
+    The system prompt and user context go in the system instruction, a
+    prefix that stays the same from turn to turn so the model's implicit
+    prefix caching can reuse it; the history is compacted to the
+    configured token budget.
+    """
     system_prompt = f"""You are a helpful financial advisor assistant.
     You help users understand their spending patterns and provide personalized advice.
 
@@ -52,20 +210,15 @@ async def chat_with_ai(messages: list[dict], user_context: str) -> str:
     Focus on practical tips that can help the user improve their financial health.
     """
 
+    summary, recent = compact_history(messages)
+
     # Build conversation contents
-    contents = [
-        types.Content(
-            role="user",
-            parts=[types.Part(text=system_prompt)]
-        ),
-        types.Content(
-            role="model",
-            parts=[types.Part(text="I understand. I'll help you with personalized financial advice based on your spending data.")]
-        ),
-    ]
-
-    # Process previous messages
-    for msg in messages[:-1]:
+    contents = []
+    if summary:
+        contents.append(types.Content(role="user", parts=[types.Part(text=summary)]))
+        contents.append(types.Content(role="model", parts=[types.Part(text="Noted.")]))
+
+    for msg in recent:
         role = "user" if msg["role"] == "user" else "model"
         contents.append(
             types.Content(
@@ -74,20 +227,23 @@ async def chat_with_ai(messages: list[dict], user_context: str) -> str:
             )
         )
 
-    # Add the latest user message
-    contents.append(
-        types.Content(
-            role="user",
-            parts=[types.Part(text=messages[-1]["content"])]
-        )
-    )
+    return contents, get_generation_config(system_instruction=system_prompt)
+
 
+async def chat_with_ai(messages: list[dict], user_context: str) -> str:
+    """Chat with AI about finances."""
     try:
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=contents,
-            config=get_generation_config(),
-        )
-        return response.text
+        contents, config = build_chat_request(messages, user_context)
+        return await generate_content(contents, config)
+    except Exception as e:
+        raise Exception(f"Failed to get chat response: {str(e)}")
+
+
+async def stream_chat_with_ai(messages: list[dict], user_context: str) -> AsyncIterator[str]:
+    """Chat with AI about finances, yielding the reply as it is generated."""
+    try:
+        contents, config = build_chat_request(messages, user_context)
+        async for text in stream_content(contents, config):
+            yield text
     except Exception as e:
         raise Exception(f"Failed to get chat response: {str(e)}")
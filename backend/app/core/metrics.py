@@ -0,0 +1,105 @@
+"""Minimal in-process metrics rendered in the Prometheus text format."""
+
+
+class Counter:
+    """Monotonically increasing value."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def samples(self) -> list[tuple[str, float]]:
+        return [(self.name, self.value)]
+
+
+class Gauge:
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def samples(self) -> list[tuple[str, float]]:
+        return [(self.name, self.value)]
+
+
+class Summary:
+    """Count, sum and max of observed values (e.g. durations in seconds)."""
+
+    kind = "summary"
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def samples(self) -> list[tuple[str, float]]:
+        return [
+            (f"{self.name}_count", self.count),
+            (f"{self.name}_sum", self.total),
+        ]
+
+
+class MetricsRegistry:
+    """Registry of named metrics. Metrics are created on first use."""
+
+    def __init__(self):
+        self._metrics: dict[str, Counter | Gauge | Summary] = {}
+
+    def _get_or_create(self, cls, name: str, description: str):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = cls(name, description)
+            self._metrics[name] = metric
+        return metric
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        return self._get_or_create(Counter, name, description)
+
+    def gauge(self, name: str, description: str = "") -> Gauge:
+        return self._get_or_create(Gauge, name, description)
+
+    def summary(self, name: str, description: str = "") -> Summary:
+        return self._get_or_create(Summary, name, description)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            if metric.description:
+                lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, value in metric.samples():
+                lines.append(f"{name} {value}")
+            if isinstance(metric, Summary):
+                lines.append(f"# TYPE {metric.name}_max gauge")
+                lines.append(f"{metric.name}_max {metric.max}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
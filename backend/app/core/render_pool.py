@@ -0,0 +1,90 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+
+from app.config import get_settings
+from app.core.exceptions import ServiceUnavailableException
+from app.core.metrics import metrics
+
+# Shared pool, created once in the application lifespan
+_executor: ProcessPoolExecutor | None = None
+_semaphore: asyncio.Semaphore | None = None
+_waiting = 0
+
+render_queue_seconds = metrics.summary(
+    "render_pool_queue_seconds", "Time render jobs waited for a free worker"
+)
+render_seconds = metrics.summary(
+    "render_pool_render_seconds", "Time render jobs spent running in a worker"
+)
+render_in_flight = metrics.gauge(
+    "render_pool_in_flight", "Render jobs currently running"
+)
+render_waiting = metrics.gauge(
+    "render_pool_waiting", "Render jobs waiting for a free worker"
+)
+render_rejected = metrics.counter(
+    "render_pool_rejected_total", "Render jobs turned away because the queue was full"
+)
+
+
+def init_render_pool() -> None:
+    """Create the render process pool."""
+    global _executor, _semaphore
+    if _executor is None:
+        workers = get_settings().render_pool_workers
+        # spawn, not fork: the parent runs an event loop and other threads
+        _executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        _semaphore = asyncio.Semaphore(workers)
+
+
+def close_render_pool() -> None:
+    """Stop the render workers, dropping jobs that have not started."""
+    global _executor, _semaphore
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        _semaphore = None
+
+
+async def run_in_render_pool(fn: Callable[..., Any], *args: Any) -> Any:
+    """Run a picklable CPU-bound function in a worker process.
+
+    At most one job per worker is submitted at a time so that queue time is
+    measured here, and callers beyond the waiting limit get a 503 instead of
+    piling up behind a long render.
+    """
+    global _waiting
+    if _executor is None:
+        init_render_pool()
+
+    if _waiting >= get_settings().render_pool_max_waiting:
+        render_rejected.inc()
+        raise ServiceUnavailableException(
+            "Too many reports are being generated, please try again shortly"
+        )
+
+    executor, semaphore = _executor, _semaphore
+    queued = time.perf_counter()
+    _waiting += 1
+    render_waiting.set(_waiting)
+    try:
+        await semaphore.acquire()
+    finally:
+        _waiting -= 1
+        render_waiting.set(_waiting)
+
+    started = time.perf_counter()
+    render_queue_seconds.observe(started - queued)
+    render_in_flight.inc()
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, fn, *args)
+    finally:
+        render_in_flight.dec()
+        render_seconds.observe(time.perf_counter() - started)
+        semaphore.release()
@@ -1,11 +1,150 @@
+import asyncio
+import logging
+import time
+from functools import lru_cache
+
+import httpx
+import jwt
 from fastapi import HTTPException, Security, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
+from app.config import get_settings
 from app.core.supabase import get_supabase_client
 
+logger = logging.getLogger(__name__)
+
 security = HTTPBearer()
 security_optional = HTTPBearer(auto_error=False)
 
+# Asymmetric algorithms Supabase uses for JWT signing keys
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256")
+
+# Minimum seconds between on-demand JWKS fetches for unknown key ids
+JWKS_MIN_REFETCH_INTERVAL = 30
+
+
+class JWKSCache:
+    """In-memory cache of the project's JSON Web Key Set."""
+
+    def __init__(self, url: str, refresh_interval: int):
+        self.url = url
+        self.refresh_interval = refresh_interval
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def refresh(self) -> None:
+        """Fetch the key set and replace the cached keys."""
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            response = await client.get(self.url)
+            response.raise_for_status()
+
+        try:
+            jwk_set = jwt.PyJWKSet.from_dict(response.json())
+            keys = {key.key_id: key for key in jwk_set.keys if key.key_id}
+        except jwt.PyJWKSetError:
+            # Projects still on the legacy shared secret publish an empty set
+            keys = {}
+
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+
+    async def get_signing_key(self, key_id: str | None) -> jwt.PyJWK:
+        """Get the signing key for a key id, refetching once if it is unknown."""
+        key = self._keys.get(key_id)
+
+        if key is None:
+            async with self._lock:
+                # Keys may have been rotated since the last background refresh
+                if (
+                    key_id not in self._keys
+                    and time.monotonic() - self._fetched_at > JWKS_MIN_REFETCH_INTERVAL
+                ):
+                    await self.refresh()
+            key = self._keys.get(key_id)
+
+        if key is None:
+            raise jwt.InvalidTokenError("Unknown signing key")
+
+        return key
+
+    async def run(self) -> None:
+        """Keep the key set fresh so key rotation never hits a request."""
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning("Failed to refresh JWKS: %s", e)
+            await asyncio.sleep(self.refresh_interval)
+
+
+@lru_cache()
+def get_jwks_cache() -> JWKSCache:
+    """Get JWKS cache instance (singleton)."""
+    settings = get_settings()
+    return JWKSCache(
+        f"{settings.supabase_url}/auth/v1/.well-known/jwks.json",
+        settings.jwks_refresh_interval,
+    )
+
+
+async def verify_token_locally(token: str) -> dict:
+    """Verify a Supabase access token without calling the auth server.
+
+    Checks signature, expiry, audience and issuer against the project JWT
+    secret (HS256) or the cached JWKS (RS256/ES256). Unlike remote
+    verification, a token stays valid until it expires even if the session
+    is revoked earlier.
+    """
+    settings = get_settings()
+    header = jwt.get_unverified_header(token)
+    algorithm = header.get("alg")
+
+    if algorithm == "HS256":
+        if not settings.supabase_jwt_secret:
+            raise jwt.InvalidTokenError("JWT secret is not configured")
+        key = settings.supabase_jwt_secret
+    elif algorithm in ASYMMETRIC_ALGORITHMS:
+        key = (await get_jwks_cache().get_signing_key(header.get("kid"))).key
+    else:
+        raise jwt.InvalidTokenError(f"Unsupported signing algorithm: {algorithm}")
+
+    claims = jwt.decode(
+        token,
+        key,
+        algorithms=[algorithm],
+        audience=settings.jwt_audience,
+        issuer=f"{settings.supabase_url}/auth/v1",
+        leeway=settings.jwt_leeway_seconds,
+        options={"require": ["exp", "sub"]},
+    )
+
+    return {
+        "id": claims["sub"],
+        "email": claims.get("email"),
+        "user_metadata": claims.get("user_metadata") or {},
+    }
+
+
+async def verify_token_remotely(token: str) -> dict:
+    """Verify a token by asking the Supabase auth server."""
+    supabase = get_supabase_client()
+
+    # Verify the token with Supabase
+    response = await supabase.auth.get_user(token)
+
+    if not response.user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication token",
+        )
+
+    return {
+        "id": response.user.id,
+        "email": response.user.email,
+        "user_metadata": response.user.user_metadata,
+    }
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Security(security),
@@ -14,22 +153,9 @@ async def get_current_user(
     token = credentials.credentials
 
     try:
-        supabase = get_supabase_client()
-
-        # Verify the token with Supabase
-        response = supabase.auth.get_user(token)
-
-        if not response.user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication token",
-            )
-
-        return {
-            "id": response.user.id,
-            "email": response.user.email,
-            "user_metadata": response.user.user_metadata,
-        }
+        if get_settings().auth_verify_mode == "local":
+            return await verify_token_locally(token)
+        return await verify_token_remotely(token)
 
     except Exception as e:
         raise HTTPException(
@@ -0,0 +1,90 @@
+"""Single-flight coalescing of identical concurrent reads.
+
+When several requests ask for the same thing at once (dashboard widgets
+loading together, a second tab, a client retry), only the first runs the
+queries; the others wait for it and get the same result. Keys include the
+user's data version, so a read that starts after a write never joins a
+call that began before it.
+"""
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Hashable
+
+from app.config import get_settings
+from app.core.cache import get_data_version
+from app.core.metrics import metrics
+
+
+class SingleFlight:
+    """Shares one in-flight call between concurrent callers with the same key.
+
+    The call runs as its own task, so a caller that is cancelled (say, the
+    client disconnected) does not cancel it for the others. At most
+    max_keys calls are tracked; beyond that callers run uncoalesced.
+    """
+
+    def __init__(self, name: str, max_keys: int):
+        self.max_keys = max_keys
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self._total = metrics.counter(f"{name}_calls_total", f"{name} calls")
+        self._coalesced = metrics.counter(
+            f"{name}_coalesced_total", f"{name} calls that joined one already in flight"
+        )
+        self._overflow = metrics.counter(
+            f"{name}_overflow_total", f"{name} calls run uncoalesced because the key table was full"
+        )
+        self._rate = metrics.gauge(
+            f"{name}_coalescing_ratio", f"Share of {name} calls served by another in-flight call"
+        )
+        self._keys = metrics.gauge(f"{name}_in_flight_keys", f"{name} keys currently in flight")
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn, or wait for the call already running under key."""
+        task = self._calls.get(key)
+        self._record(coalesced=task is not None)
+        if task is None:
+            if len(self._calls) >= self.max_keys:
+                self._overflow.inc()
+                return await fn()
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            self._keys.set(len(self._calls))
+            task.add_done_callback(functools.partial(self._forget, key))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+            self._keys.set(len(self._calls))
+        # Mark the error as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def _record(self, coalesced: bool) -> None:
+        self._total.inc()
+        if coalesced:
+            self._coalesced.inc()
+        self._rate.set(round(self._coalesced.value / self._total.value, 4))
+
+
+service_reads = SingleFlight("service_reads", max_keys=get_settings().singleflight_max_keys)
+
+
+def coalesce(method: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Coalesce concurrent calls of a `(self, user_id, ...)` service read method.
+
+    Arguments after user_id must be hashable.
+    """
+
+    @functools.wraps(method)
+    async def wrapper(self, user_id: str, *args, **kwargs):
+        key = (
+            method.__qualname__,
+            user_id,
+            get_data_version(user_id),
+            args,
+            tuple(sorted(kwargs.items())),
+        )
+        return await service_reads.do(key, lambda: method(self, user_id, *args, **kwargs))
+
+    return wrapper
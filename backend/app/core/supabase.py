@@ -1,19 +1,137 @@
-from supabase import create_client, Client
-from functools import lru_cache
+import asyncio
+import random
+import time
 
-from app.config import get_settings
+import httpx
+from supabase import acreate_client, AsyncClient, AsyncClientOptions
 
+from app.config import Settings, get_settings
+from app.core.metrics import metrics
 
-@lru_cache()
-def get_supabase_client() -> Client:
-    """Get Supabase client instance (singleton)."""
+# Shared client, created once in the application lifespan
+_client: AsyncClient | None = None
+
+# Methods that are safe to resend after a transport failure
+IDEMPOTENT_METHODS = {"GET", "HEAD"}
+
+# Transport failures worth retrying; the request may not have reached PostgREST
+RETRYABLE_ERRORS = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.ReadTimeout,
+    httpx.RemoteProtocolError,
+)
+
+pool_in_flight = metrics.gauge(
+    "postgrest_pool_in_flight", "PostgREST requests currently in flight"
+)
+pool_saturation = metrics.gauge(
+    "postgrest_pool_saturation", "In-flight requests divided by the connection pool size"
+)
+pool_wait_seconds = metrics.summary(
+    "postgrest_pool_wait_seconds", "Time spent waiting for a pooled connection"
+)
+request_retries = metrics.counter(
+    "postgrest_request_retries_total", "Idempotent PostgREST requests retried"
+)
+
+
+class PooledTransport(httpx.AsyncBaseTransport):
+    """Keep-alive connection pool for PostgREST with metrics and GET retries."""
+
+    def __init__(self, settings: Settings):
+        self.max_connections = settings.postgrest_pool_max_connections
+        self.max_retries = settings.postgrest_get_retries
+        self._transport = httpx.AsyncHTTPTransport(
+            http2=settings.postgrest_http2,
+            limits=httpx.Limits(
+                max_connections=settings.postgrest_pool_max_connections,
+                max_keepalive_connections=settings.postgrest_pool_max_keepalive,
+                keepalive_expiry=settings.postgrest_keepalive_expiry,
+            ),
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            try:
+                return await self._send(request)
+            except RETRYABLE_ERRORS:
+                if request.method not in IDEMPOTENT_METHODS or attempt >= self.max_retries:
+                    raise
+
+            attempt += 1
+            request_retries.inc()
+            await asyncio.sleep(random.uniform(0, 0.1 * 2**attempt))
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        acquired = False
+        parent_trace = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: dict) -> None:
+            # The first connection event fires once the pool has handed us a
+            # connection, so the time until then is pool wait
+            nonlocal acquired
+            if not acquired:
+                acquired = True
+                pool_wait_seconds.observe(time.perf_counter() - started)
+            if parent_trace:
+                await parent_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+        pool_in_flight.inc()
+        pool_saturation.set(pool_in_flight.value / self.max_connections)
+        try:
+            return await self._transport.handle_async_request(request)
+        finally:
+            pool_in_flight.dec()
+            pool_saturation.set(pool_in_flight.value / self.max_connections)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def create_http_client(settings: Settings) -> httpx.AsyncClient:
+    """Create the pooled HTTP client used for PostgREST calls."""
+    return httpx.AsyncClient(
+        transport=PooledTransport(settings),
+        timeout=httpx.Timeout(
+            settings.postgrest_read_timeout,
+            connect=settings.postgrest_connect_timeout,
+            pool=settings.postgrest_pool_timeout,
+        ),
+        follow_redirects=True,
+    )
+
+
+async def init_supabase_client() -> AsyncClient:
+    """Create the shared async Supabase client."""
+    global _client
     settings = get_settings()
-    return create_client(
+    _client = await acreate_client(
         settings.supabase_url,
-        settings.supabase_service_key
+        settings.supabase_service_key,
+        options=AsyncClientOptions(httpx_client=create_http_client(settings)),
     )
+    return _client
+
+
+async def close_supabase_client() -> None:
+    """Close the shared client's HTTP connections."""
+    global _client
+    if _client is not None:
+        await _client.postgrest.aclose()
+        _client = None
+
+
+def get_supabase_client() -> AsyncClient:
+    """Get the shared Supabase client instance."""
+    if _client is None:
+        raise RuntimeError("Supabase client is not initialized")
+    return _client
 
 
-def get_db() -> Client:
+def get_db() -> AsyncClient:
     """Dependency to get Supabase client."""
     return get_supabase_client()
@@ -1,8 +1,14 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from contextlib import asynccontextmanager
+from fastapi.responses import PlainTextResponse
+from contextlib import asynccontextmanager, suppress
 
 from app.config import get_settings
+from app.core.security import get_jwks_cache
+from app.core.metrics import metrics
+from app.core.supabase import init_supabase_client, close_supabase_client
+from app.core.render_pool import init_render_pool, close_render_pool
 from app.api.v1.router import api_router
 
 
@@ -10,9 +16,24 @@ from app.api.v1.router import api_router
 async def lifespan(app: FastAPI):
     # Startup
     print("Starting Finance Tracker API...")
+    await init_supabase_client()
+    init_render_pool()
+
+    # Refresh signing keys in the background so rotation never blocks auth
+    jwks_task = None
+    if get_settings().auth_verify_mode == "local":
+        jwks_task = asyncio.create_task(get_jwks_cache().run())
+
     yield
+
     # Shutdown
     print("Shutting down Finance Tracker API...")
+    if jwks_task:
+        jwks_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await jwks_task
+    close_render_pool()
+    await close_supabase_client()
 
 
 settings = get_settings()
@@ -51,3 +72,8 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return metrics.render()
@@ -21,10 +21,12 @@ class PaginatedResponse(ResponseBase, Generic[T]):
     """Paginated response."""
 
     data: list[T]
-    total: int
+    # None on keyset pages after the first, which are not counted
+    total: int | None
     page: int
     limit: int
-    total_pages: int
+    total_pages: int | None
+    next_cursor: str | None = None
 
 
 class DateRangeParams(BaseModel):
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+
+from app.models.budget import BudgetStatus
+from app.models.expense import ExpenseResponse
+from app.models.goal import GoalResponse
+from app.models.insight import SpendingSummary
+
+
+class Dashboard(BaseModel):
+    """Everything the dashboard page shows, in one response."""
+
+    summary: SpendingSummary
+    budget_status: list[BudgetStatus]
+    recent_expenses: list[ExpenseResponse]
+    goals: list[GoalResponse]
@@ -29,6 +29,25 @@ class ExpenseUpdate(BaseModel):
     payment_method: str | None = None
 
 
+class ExpenseBatchUpdate(BaseModel):
+    """Apply the same changes to several expenses."""
+
+    ids: list[str] = Field(min_length=1)
+    patch: ExpenseUpdate
+
+
+class ExpenseBatchDelete(BaseModel):
+    """Delete several expenses."""
+
+    ids: list[str] = Field(min_length=1)
+
+
+class ExpenseBatchResult(BaseModel):
+    """Ids of the expenses a batch operation changed."""
+
+    ids: list[str]
+
+
 class CategoryInfo(BaseModel):
     """Category info for expense."""
 
@@ -61,3 +80,20 @@ class ExpenseFilters(BaseModel):
     max_amount: float | None = None
     search: str | None = None
     payment_method: str | None = None
+
+
+class ExpenseImportError(BaseModel):
+    """A row rejected during bulk import."""
+
+    row: int
+    errors: list[str]
+
+
+class ExpenseImportResult(BaseModel):
+    """Bulk import outcome."""
+
+    inserted: int
+    failed: int
+    errors: list[ExpenseImportError]
+    elapsed_seconds: float
+    rows_per_second: float
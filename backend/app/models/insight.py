@@ -70,12 +70,21 @@ class PredictionBreakdown(BaseModel):
     category_id: str
     category_name: str
     predicted_amount: float
+    lower_bound: float | None = None
+    upper_bound: float | None = None
 
 
 class SpendingPrediction(BaseModel):
-    """Spending prediction model."""
+    """Spending prediction model.
+
+    The bounds are a prediction interval at the configured level, absent
+    when there is too little history to fit; confidence is 1 minus the
+    interval's half-width relative to the predicted amount.
+    """
 
     period: str
     predicted_amount: float
+    lower_bound: float | None = None
+    upper_bound: float | None = None
     confidence: float
     breakdown: list[PredictionBreakdown]
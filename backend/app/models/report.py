@@ -46,7 +46,7 @@ class CategoryReport(BaseModel):
 class ExportRequest(BaseModel):
     """Export request model."""
 
-    format: Literal["csv", "pdf"]
+    format: Literal["csv", "pdf", "parquet", "arrow"]
     start_date: str
     end_date: str
     include_categories: bool = True
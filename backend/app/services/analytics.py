@@ -0,0 +1,78 @@
+"""Vectorized aggregations over a user's expenses.
+
+Expenses are fetched column-wise by the get_expense_columns RPC and held
+as NumPy arrays: amounts as float64, dates as datetime64 and categories as
+integer codes. Group-bys are then bincounts over those arrays rather than
+Python loops updating a dict per row.
+"""
+from supabase import AsyncClient
+import numpy as np
+
+
+class ExpenseFrame:
+    """Expenses as parallel arrays, with categories as integer codes.
+
+    categories[code] is the {"id", "name", "color"} of a category; name and
+    color are None if the category no longer exists.
+    """
+
+    def __init__(self, columns: dict):
+        self.amounts = np.asarray(columns["amount"], dtype=np.float64)
+        self.dates = np.asarray(columns["day"], dtype=np.int64).astype("datetime64[D]")
+        self.codes = np.asarray(columns["category"], dtype=np.intp)
+        self.categories: list[dict] = columns["categories"]
+
+    @classmethod
+    async def fetch(
+        cls, db: AsyncClient, user_id: str, start_date: str, end_date: str
+    ) -> "ExpenseFrame":
+        """Load a user's expenses between two dates, inclusive."""
+        columns = (
+            await db.rpc(
+                "get_expense_columns",
+                {"p_user_id": user_id, "p_start_date": start_date, "p_end_date": end_date},
+            ).execute()
+        ).data
+        return cls(columns)
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    @property
+    def total(self) -> float:
+        return float(self.amounts.sum())
+
+    def category_sums(self) -> np.ndarray:
+        """Total amount per category code."""
+        return np.bincount(self.codes, weights=self.amounts, minlength=len(self.categories))
+
+    def category_counts(self) -> np.ndarray:
+        """Number of expenses per category code."""
+        return np.bincount(self.codes, minlength=len(self.categories))
+
+    def category_month_sums(self, first_month: np.datetime64, months: int) -> np.ndarray:
+        """Amount per (category code, month) for `months` months from first_month.
+
+        Expenses outside that range are ignored.
+        """
+        offsets = (
+            self.dates.astype("datetime64[M]") - np.datetime64(first_month, "M")
+        ).astype(np.intp)
+        inside = (offsets >= 0) & (offsets < months)
+        cells = self.codes[inside] * months + offsets[inside]
+        sums = np.bincount(
+            cells, weights=self.amounts[inside], minlength=len(self.categories) * months
+        )
+        return sums.reshape(len(self.categories), months)
+
+
+def percentages(values: np.ndarray, total: float) -> np.ndarray:
+    """Each value as a percentage of total; zeros when the total is zero."""
+    if total <= 0:
+        return np.zeros_like(values, dtype=np.float64)
+    return values / total * 100
+
+
+def means(sums: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Element-wise sums / counts, with zero where the count is zero."""
+    return np.divide(sums, counts, out=np.zeros_like(sums, dtype=np.float64), where=counts > 0)
@@ -1,17 +1,21 @@
-from supabase import Client
+from supabase import AsyncClient
 from datetime import datetime, timedelta
+from app.config import get_settings
 from app.models.budget import BudgetCreate, BudgetUpdate, BudgetResponse, BudgetStatus
 from app.core.exceptions import NotFoundException, BadRequestException
+from app.core.cache import bump_data_version
+from app.core.singleflight import coalesce
 
 
 class BudgetService:
-    def __init__(self, db: Client):
+    def __init__(self, db: AsyncClient):
         self.db = db
 
+    @coalesce
     async def list_budgets(self, user_id: str) -> list[BudgetResponse]:
         """List all budgets for a user."""
         result = (
-            self.db.table("budgets")
+            await self.db.table("budgets")
             .select("*, category:categories(id, name, icon, color)")
             .eq("user_id", user_id)
             .order("created_at", desc=True)
@@ -26,10 +30,11 @@ class BudgetService:
         data = budget.model_dump()
         data["user_id"] = user_id
 
-        result = self.db.table("budgets").insert(data).execute()
+        result = await self.db.table("budgets").insert(data).execute()
 
         if not result.data:
             raise BadRequestException("Failed to create budget")
+        bump_data_version(user_id)
 
         budget_id = result.data[0]["id"]
         return await self.get_budget(user_id, budget_id)
@@ -37,7 +42,7 @@ class BudgetService:
     async def get_budget(self, user_id: str, budget_id: str) -> BudgetResponse:
         """Get a single budget."""
         result = (
-            self.db.table("budgets")
+            await self.db.table("budgets")
             .select("*, category:categories(id, name, icon, color)")
             .eq("id", budget_id)
             .eq("user_id", user_id)
@@ -59,7 +64,7 @@ class BudgetService:
         data = budget.model_dump(exclude_unset=True)
 
         result = (
-            self.db.table("budgets")
+            await self.db.table("budgets")
             .update(data)
             .eq("id", budget_id)
             .eq("user_id", user_id)
@@ -68,6 +73,7 @@ class BudgetService:
 
         if not result.data:
             raise BadRequestException("Failed to update budget")
+        bump_data_version(user_id)
 
         return await self.get_budget(user_id, budget_id)
 
@@ -75,36 +81,45 @@ class BudgetService:
         """Delete a budget."""
         await self.get_budget(user_id, budget_id)
 
-        self.db.table("budgets").delete().eq("id", budget_id).eq(
+        await self.db.table("budgets").delete().eq("id", budget_id).eq(
             "user_id", user_id
         ).execute()
+        bump_data_version(user_id)
 
+    @coalesce
     async def get_budget_status(self, user_id: str) -> list[BudgetStatus]:
         """Get budget status with spending info."""
         budgets = await self.list_budgets(user_id)
-        result = []
+        if not budgets:
+            return []
 
+        # Calculate date range based on period for every budget
+        windows = []
         for budget in budgets:
-            # Calculate date range based on period
             start_date, end_date = self._get_period_dates(
                 budget["period"], budget["start_date"]
             )
+            windows.append({
+                "budget_id": budget["id"],
+                "category_id": budget["category_id"],
+                "start_date": start_date,
+                "end_date": end_date,
+            })
+
+        # Sum spending for all windows in one server-side aggregate
+        spending = await self.db.rpc(
+            "get_budget_spending",
+            {
+                "p_user_id": user_id,
+                "p_windows": windows,
+                "p_use_rollup": get_settings().use_daily_spend_rollup,
+            },
+        ).execute()
+        spent_by_budget = {row["budget_id"]: float(row["spent"]) for row in spending.data}
 
-            # Get total spent for this budget's category (or all if overall)
-            query = (
-                self.db.table("expenses")
-                .select("amount")
-                .eq("user_id", user_id)
-                .gte("date", start_date)
-                .lte("date", end_date)
-            )
-
-            if budget["category_id"]:
-                query = query.eq("category_id", budget["category_id"])
-
-            expenses_result = query.execute()
-
-            spent = sum(e["amount"] for e in expenses_result.data)
+        result = []
+        for budget in budgets:
+            spent = spent_by_budget.get(budget["id"], 0.0)
             remaining = budget["amount"] - spent
             percentage = (spent / budget["amount"]) * 100 if budget["amount"] > 0 else 0
 
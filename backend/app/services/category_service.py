@@ -1,15 +1,18 @@
-from supabase import Client
+from supabase import AsyncClient
 from app.core.exceptions import NotFoundException, BadRequestException, ForbiddenException
+from app.core.cache import bump_data_version
+from app.core.singleflight import coalesce
 
 
 class CategoryService:
-    def __init__(self, db: Client):
+    def __init__(self, db: AsyncClient):
         self.db = db
 
+    @coalesce
     async def list_categories(self, user_id: str) -> list[dict]:
         """List all categories for a user (including defaults)."""
         result = (
-            self.db.table("categories")
+            await self.db.table("categories")
             .select("*")
             .or_(f"user_id.eq.{user_id},is_default.eq.true")
             .order("is_default", desc=True)
@@ -26,7 +29,7 @@ class CategoryService:
 
         # Check if category with same name exists
         existing = (
-            self.db.table("categories")
+            await self.db.table("categories")
             .select("id")
             .eq("user_id", user_id)
             .eq("name", data["name"])
@@ -36,17 +39,18 @@ class CategoryService:
         if existing.data:
             raise BadRequestException("Category with this name already exists")
 
-        result = self.db.table("categories").insert(data).execute()
+        result = await self.db.table("categories").insert(data).execute()
 
         if not result.data:
             raise BadRequestException("Failed to create category")
+        bump_data_version(user_id)
 
         return result.data[0]
 
     async def get_category(self, user_id: str, category_id: str) -> dict:
         """Get a single category."""
         result = (
-            self.db.table("categories")
+            await self.db.table("categories")
             .select("*")
             .eq("id", category_id)
             .single()
@@ -74,7 +78,7 @@ class CategoryService:
         data = category.model_dump(exclude_unset=True)
 
         result = (
-            self.db.table("categories")
+            await self.db.table("categories")
             .update(data)
             .eq("id", category_id)
             .eq("user_id", user_id)
@@ -84,6 +88,8 @@ class CategoryService:
         if not result.data:
             raise BadRequestException("Failed to update category")
 
+        # Reports embed category names and colors
+        bump_data_version(user_id)
         return result.data[0]
 
     async def delete_category(self, user_id: str, category_id: str) -> None:
@@ -95,7 +101,7 @@ class CategoryService:
 
         # Check if category is used by any expenses
         expenses = (
-            self.db.table("expenses")
+            await self.db.table("expenses")
             .select("id")
             .eq("category_id", category_id)
             .limit(1)
@@ -108,6 +114,7 @@ class CategoryService:
                 "Please reassign or delete those expenses first."
             )
 
-        self.db.table("categories").delete().eq("id", category_id).eq(
+        await self.db.table("categories").delete().eq("id", category_id).eq(
             "user_id", user_id
         ).execute()
+        bump_data_version(user_id)
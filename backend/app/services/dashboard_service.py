@@ -0,0 +1,54 @@
+from supabase import AsyncClient
+from typing import Awaitable, TypeVar
+import asyncio
+import time
+
+from app.models.dashboard import Dashboard
+from app.services.budget_service import BudgetService
+from app.services.expense_service import ExpenseService
+from app.services.goal_service import GoalService
+from app.services.insight_service import InsightService
+
+T = TypeVar("T")
+
+
+class DashboardService:
+    def __init__(self, db: AsyncClient):
+        self.db = db
+
+    async def get_dashboard(
+        self, user_id: str, period: str, recent_limit: int
+    ) -> tuple[Dashboard, dict[str, float]]:
+        """Load every dashboard section concurrently.
+
+        Returns the dashboard and how long each section took, in ms.
+        """
+        timings: dict[str, float] = {}
+        summary, budget_status, recent_expenses, goals = await asyncio.gather(
+            self._timed(
+                "summary", InsightService(self.db).get_spending_summary(user_id, period), timings
+            ),
+            self._timed("budgets", BudgetService(self.db).get_budget_status(user_id), timings),
+            self._timed(
+                "expenses",
+                ExpenseService(self.db).list_recent_expenses(user_id, recent_limit),
+                timings,
+            ),
+            self._timed("goals", GoalService(self.db).list_goals(user_id), timings),
+        )
+
+        dashboard = Dashboard(
+            summary=summary,
+            budget_status=budget_status,
+            recent_expenses=recent_expenses,
+            goals=goals,
+        )
+        return dashboard, timings
+
+    @staticmethod
+    async def _timed(name: str, call: Awaitable[T], timings: dict[str, float]) -> T:
+        started = time.perf_counter()
+        try:
+            return await call
+        finally:
+            timings[name] = (time.perf_counter() - started) * 1000
@@ -1,16 +1,35 @@
-from supabase import Client
+from supabase import AsyncClient
+from postgrest import APIError
+from postgrest.types import ReturnMethod
+from pydantic import ValidationError
+from datetime import date
+from typing import Any, Iterable, Literal
+import base64
+import binascii
+import json
+import logging
+import time
+import uuid
+
+from app.config import get_settings
 from app.models.expense import (
     ExpenseCreate,
     ExpenseUpdate,
     ExpenseResponse,
     ExpenseFilters,
+    ExpenseImportError,
+    ExpenseImportResult,
 )
 from app.models.common import PaginatedResponse
 from app.core.exceptions import NotFoundException, BadRequestException
+from app.core.cache import bump_data_version
+from app.core.singleflight import coalesce
+
+logger = logging.getLogger(__name__)
 
 
 class ExpenseService:
-    def __init__(self, db: Client):
+    def __init__(self, db: AsyncClient):
         self.db = db
 
     async def list_expenses(
@@ -19,10 +38,38 @@ class ExpenseService:
         page: int,
         limit: int,
         filters: ExpenseFilters,
+        cursor: str | None = None,
+        count: Literal["exact", "planned", "estimated"] = "exact",
     ) -> PaginatedResponse[ExpenseResponse]:
-        """List expenses with pagination and filters."""
+        """List expenses with pagination and filters.
+
+        Passing a cursor (an empty string for the first page) switches from
+        page/offset to keyset pagination on (date, id), which costs the same
+        at any depth and does not shift when rows are inserted concurrently.
+        The first keyset page (empty cursor) carries the filtered total;
+        later pages skip the count and return a total of None, since the
+        keyset predicate would otherwise shrink it page by page.
+
+        The total is returned with the page in the same request. "planned"
+        and "estimated" counts come from the query planner and avoid a full
+        count on large histories.
+
+        Searches in page mode are relevance-ranked by the full-text backend;
+        ilike matching is used otherwise or if that backend is unavailable.
+        """
+        if (
+            filters.search
+            and cursor is None
+            and get_settings().expense_search_backend == "fulltext"
+        ):
+            try:
+                return await self._search_expenses(user_id, page, limit, filters)
+            except APIError as e:
+                logger.warning("Full-text search failed, falling back to ilike: %s", e.message)
+
         query = self.db.table("expenses").select(
-            "*, category:categories(id, name, icon, color)"
+            "*, category:categories(id, name, icon, color)",
+            count=None if cursor else count,
         ).eq("user_id", user_id)
 
         # Apply filters
@@ -41,19 +88,87 @@ class ExpenseService:
         if filters.search:
             query = query.ilike("description", f"%{filters.search}%")
 
-        # Get total count
-        count_query = self.db.table("expenses").select("id", count="exact").eq("user_id", user_id)
-        count_result = count_query.execute()
-        total = count_result.count or 0
+        # Order by id as well so rows with the same date never swap pages
+        query = query.order("date", desc=True).order("id", desc=True)
 
         # Apply pagination
-        offset = (page - 1) * limit
-        query = query.order("date", desc=True).range(offset, offset + limit - 1)
+        next_cursor = None
+        if cursor is not None:
+            if cursor:
+                last_date, last_id = self._decode_cursor(cursor)
+                # The lte bound lets the (user_id, date, id) index seek to the cursor
+                query = query.lte("date", last_date).or_(
+                    f"date.lt.{last_date},and(date.eq.{last_date},id.lt.{last_id})"
+                )
+
+            # Fetch one extra row to know whether another page follows
+            result = await query.limit(limit + 1).execute()
+            rows = result.data[:limit]
+            if len(result.data) > limit:
+                next_cursor = self._encode_cursor(rows[-1]["date"], rows[-1]["id"])
+        else:
+            offset = (page - 1) * limit
+            result = await query.range(offset, offset + limit - 1).execute()
+            rows = result.data
+
+        if cursor:
+            total = total_pages = None
+        else:
+            total = result.count or 0
+            total_pages = (total + limit - 1) // limit if total > 0 else 1
+
+        return PaginatedResponse(
+            data=rows,
+            total=total,
+            page=page,
+            limit=limit,
+            total_pages=total_pages,
+            next_cursor=next_cursor,
+        )
+
+    @coalesce
+    async def list_recent_expenses(self, user_id: str, limit: int) -> list[ExpenseResponse]:
+        """Most recent expenses, without counting the rest."""
+        result = (
+            await self.db.table("expenses")
+            .select("*, category:categories(id, name, icon, color)")
+            .eq("user_id", user_id)
+            .order("date", desc=True)
+            .order("id", desc=True)
+            .limit(limit)
+            .execute()
+        )
+        return result.data
 
-        result = query.execute()
+    async def _search_expenses(
+        self,
+        user_id: str,
+        page: int,
+        limit: int,
+        filters: ExpenseFilters,
+    ) -> PaginatedResponse[ExpenseResponse]:
+        """Relevance-ranked description search with prefix and fuzzy matching."""
+        result = await self.db.rpc(
+            "search_expenses",
+            {
+                "p_user_id": user_id,
+                "p_query": filters.search,
+                "p_limit": limit,
+                "p_offset": (page - 1) * limit,
+                "p_start_date": filters.start_date,
+                "p_end_date": filters.end_date,
+                "p_category_id": filters.category_id,
+                "p_min_amount": filters.min_amount,
+                "p_max_amount": filters.max_amount,
+                "p_payment_method": filters.payment_method,
+            },
+        ).execute()
+
+        rows = result.data
+        total = rows[0]["total_count"] if rows else 0
 
         return PaginatedResponse(
-            data=result.data,
+            data=rows,
             total=total,
             page=page,
             limit=limit,
@@ -67,19 +182,98 @@ class ExpenseService:
         data = expense.model_dump()
         data["user_id"] = user_id
 
-        result = self.db.table("expenses").insert(data).execute()
+        result = await self.db.table("expenses").insert(data).execute()
 
         if not result.data:
             raise BadRequestException("Failed to create expense")
+        bump_data_version(user_id)
 
         # Fetch with category info
         expense_id = result.data[0]["id"]
         return await self.get_expense(user_id, expense_id)
 
+    async def bulk_create_expenses(
+        self, user_id: str, rows: Iterable[Any]
+    ) -> ExpenseImportResult:
+        """Validate and insert many expenses, reporting rejected rows.
+
+        Rows are consumed one at a time and inserted in chunks with a single
+        statement each. If a chunk is rejected by the database it is split in
+        half and each half retried, so one bad row does not sink its
+        neighbours and is isolated in a logarithmic number of inserts.
+        """
+        settings = get_settings()
+        started = time.perf_counter()
+        errors: list[ExpenseImportError] = []
+        chunk: list[tuple[int, dict]] = []
+        inserted = 0
+
+        for index, raw in enumerate(rows, start=1):
+            if index > settings.bulk_import_max_rows:
+                errors.append(ExpenseImportError(
+                    row=index,
+                    errors=[f"Import is limited to {settings.bulk_import_max_rows} rows"],
+                ))
+                break
+
+            try:
+                expense = ExpenseCreate.model_validate(raw)
+            except ValidationError as e:
+                errors.append(ExpenseImportError(row=index, errors=[
+                    f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}"
+                    for err in e.errors()
+                ]))
+                continue
+
+            data = expense.model_dump()
+            data["user_id"] = user_id
+            chunk.append((index, data))
+
+            if len(chunk) >= settings.bulk_insert_chunk_size:
+                inserted += await self._insert_chunk(chunk, errors)
+                chunk = []
+
+        if chunk:
+            inserted += await self._insert_chunk(chunk, errors)
+        if inserted:
+            bump_data_version(user_id)
+
+        elapsed = time.perf_counter() - started
+        errors.sort(key=lambda error: error.row)
+        return ExpenseImportResult(
+            inserted=inserted,
+            failed=len(errors),
+            errors=errors,
+            elapsed_seconds=round(elapsed, 3),
+            rows_per_second=round(inserted / elapsed, 1) if elapsed > 0 else 0.0,
+        )
+
+    async def _insert_chunk(
+        self, chunk: list[tuple[int, dict]], errors: list[ExpenseImportError]
+    ) -> int:
+        """Insert a chunk of validated rows, bisecting it to isolate failures."""
+        try:
+            await self.db.table("expenses").insert(
+                [data for _, data in chunk], returning=ReturnMethod.minimal
+            ).execute()
+            return len(chunk)
+        except APIError as e:
+            if len(chunk) == 1:
+                errors.append(ExpenseImportError(
+                    row=chunk[0][0], errors=[e.message or "Insert failed"]
+                ))
+                return 0
+
+        middle = len(chunk) // 2
+        return (
+            await self._insert_chunk(chunk[:middle], errors)
+            + await self._insert_chunk(chunk[middle:], errors)
+        )
+
     async def get_expense(self, user_id: str, expense_id: str) -> ExpenseResponse:
         """Get a single expense."""
         result = (
-            self.db.table("expenses")
+            await self.db.table("expenses")
             .select("*, category:categories(id, name, icon, color)")
             .eq("id", expense_id)
             .eq("user_id", user_id)
@@ -103,7 +297,7 @@ class ExpenseService:
         data = expense.model_dump(exclude_unset=True)
 
         result = (
-            self.db.table("expenses")
+            await self.db.table("expenses")
             .update(data)
             .eq("id", expense_id)
             .eq("user_id", user_id)
@@ -112,6 +306,7 @@ class ExpenseService:
 
         if not result.data:
             raise BadRequestException("Failed to update expense")
+        bump_data_version(user_id)
 
         return await self.get_expense(user_id, expense_id)
 
@@ -120,6 +315,74 @@ class ExpenseService:
         # Check if expense exists
         await self.get_expense(user_id, expense_id)
 
-        self.db.table("expenses").delete().eq("id", expense_id).eq(
+        await self.db.table("expenses").delete().eq("id", expense_id).eq(
             "user_id", user_id
         ).execute()
+        bump_data_version(user_id)
+
+    async def update_expenses(
+        self, user_id: str, ids: list[str], expense: ExpenseUpdate
+    ) -> list[str]:
+        """Apply one update to several expenses; returns the ids changed."""
+        ids = self._validate_batch_ids(ids)
+        data = expense.model_dump(exclude_unset=True)
+        if not data:
+            raise BadRequestException("No fields to update")
+
+        result = (
+            await self.db.table("expenses")
+            .update(data)
+            .in_("id", ids)
+            .eq("user_id", user_id)
+            .select("id")
+            .execute()
+        )
+        if result.data:
+            bump_data_version(user_id)
+        return [row["id"] for row in result.data]
+
+    async def delete_expenses(self, user_id: str, ids: list[str]) -> list[str]:
+        """Delete several expenses; returns the ids removed."""
+        ids = self._validate_batch_ids(ids)
+
+        result = (
+            await self.db.table("expenses")
+            .delete()
+            .in_("id", ids)
+            .eq("user_id", user_id)
+            .select("id")
+            .execute()
+        )
+        if result.data:
+            bump_data_version(user_id)
+        return [row["id"] for row in result.data]
+
+    @staticmethod
+    def _validate_batch_ids(ids: list[str]) -> list[str]:
+        """Normalize, de-duplicate and bound a list of expense ids."""
+        try:
+            unique_ids = list(dict.fromkeys(str(uuid.UUID(i)) for i in ids))
+        except (ValueError, TypeError):
+            raise BadRequestException("Expense ids must be UUIDs")
+
+        max_size = get_settings().expense_batch_max_size
+        if len(unique_ids) > max_size:
+            raise BadRequestException(f"At most {max_size} expenses can be changed at once")
+
+        return unique_ids
+
+    @staticmethod
+    def _encode_cursor(expense_date: str, expense_id: str) -> str:
+        """Encode the last row's sort key as an opaque cursor."""
+        payload = json.dumps([expense_date, expense_id]).encode("utf-8")
+        return base64.urlsafe_b64encode(payload).decode("ascii")
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple[str, str]:
+        """Decode and validate a cursor into its (date, id) sort key."""
+        try:
+            payload = base64.urlsafe_b64decode(cursor.encode("ascii"))
+            expense_date, expense_id = json.loads(payload)
+            return date.fromisoformat(expense_date).isoformat(), str(uuid.UUID(expense_id))
+        except (ValueError, TypeError, binascii.Error):
+            raise BadRequestException("Invalid pagination cursor")
@@ -0,0 +1,120 @@
+"""Exponential-smoothing forecasts of monthly spending.
+
+All of a user's series are fitted together. The smoothing recursions step
+through time once, with the series and a grid of smoothing parameters as
+array axes, and each series keeps the parameters with the smallest
+one-step-ahead squared error. With two full seasons of history a series
+may instead use additive seasonality; the choice is made by AIC over the
+one-step errors of the months both models predict.
+"""
+from statistics import NormalDist
+
+import numpy as np
+
+SEASON_LENGTH = 12
+
+# Fewest months of history the models are fitted on
+MIN_HISTORY = 3
+
+ALPHAS = np.linspace(0.05, 1.0, 20)
+SEASONAL_ALPHAS, SEASONAL_GAMMAS = (
+    grid.ravel() for grid in np.meshgrid(np.linspace(0.1, 1.0, 10), [0.05, 0.1, 0.2, 0.3, 0.5])
+)
+
+
+def _fit_simple(y: np.ndarray, scored_from: int):
+    """Simple exponential smoothing over every row of y and every alpha.
+
+    Returns, per row at its best alpha: final level, alpha, the squared
+    one-step errors summed over all steps and over steps >= scored_from.
+    """
+    level = np.repeat(y[:, :1], len(ALPHAS), axis=1)
+    sse = np.zeros_like(level)
+    sse_scored = np.zeros_like(level)
+    for t in range(1, y.shape[1]):
+        error = y[:, t : t + 1] - level
+        sse += error**2
+        if t >= scored_from:
+            sse_scored += error**2
+        level = level + ALPHAS * error
+
+    rows = np.arange(len(y))
+    best = sse.argmin(axis=1)
+    return level[rows, best], ALPHAS[best], sse[rows, best], sse_scored[rows, best]
+
+
+def _fit_seasonal(y: np.ndarray, horizon: int):
+    """Additive-seasonal smoothing over every row of y and (alpha, gamma) pair.
+
+    The first season initialises the level and seasonal states. Returns,
+    per row at its best pair: the point forecast `horizon` steps ahead,
+    alpha and the summed squared one-step errors from the second season on.
+    """
+    m = SEASON_LENGTH
+    level = np.repeat(y[:, :m].mean(axis=1, keepdims=True), len(SEASONAL_ALPHAS), axis=1)
+    season = np.repeat((y[:, :m] - level[:, :1])[:, None, :], len(SEASONAL_ALPHAS), axis=1)
+    sse = np.zeros_like(level)
+    for t in range(m, y.shape[1]):
+        error = y[:, t : t + 1] - (level + season[:, :, t % m])
+        sse += error**2
+        level = level + SEASONAL_ALPHAS * error
+        season[:, :, t % m] += SEASONAL_GAMMAS * error
+
+    rows = np.arange(len(y))
+    best = sse.argmin(axis=1)
+    target = (y.shape[1] - 1 + horizon) % m
+    mean = level[rows, best] + season[rows, best, target]
+    return mean, SEASONAL_ALPHAS[best], sse[rows, best]
+
+
+def forecast(
+    series: np.ndarray, horizon: int = 1, seasonal: bool = True
+) -> tuple[np.ndarray, np.ndarray]:
+    """Forecast each row of series (n_series, n_months) `horizon` months ahead.
+
+    Returns the point forecasts and their standard deviations. Needs at
+    least MIN_HISTORY months; horizon must not exceed SEASON_LENGTH.
+    """
+    y = np.asarray(series, dtype=np.float64)
+    months = y.shape[1]
+    if months < MIN_HISTORY:
+        raise ValueError(f"Need at least {MIN_HISTORY} months of history, got {months}")
+    use_seasonal = seasonal and months >= 2 * SEASON_LENGTH
+
+    level, alpha, sse, sse_scored = _fit_simple(
+        y, scored_from=SEASON_LENGTH if use_seasonal else 1
+    )
+    mean = level
+    # One-step residual variance; alpha and the initial level are estimated
+    variance = sse / (months - 1 - 1)
+
+    if use_seasonal:
+        seasonal_mean, seasonal_alpha, seasonal_sse = _fit_seasonal(y, horizon)
+        # Both models predict the same months from the second season on
+        n = months - SEASON_LENGTH
+        with np.errstate(divide="ignore"):
+            aic_simple = n * np.log(sse_scored / n) + 2 * 1
+            aic_seasonal = n * np.log(seasonal_sse / n) + 2 * 2
+        pick = aic_seasonal < aic_simple
+        mean = np.where(pick, seasonal_mean, mean)
+        alpha = np.where(pick, seasonal_alpha, alpha)
+        variance = np.where(pick, seasonal_sse / (n - 2), variance)
+
+    # h-step variance of the additive models for h <= season length
+    std = np.sqrt(variance * (1 + (horizon - 1) * alpha**2))
+    return np.maximum(mean, 0), std
+
+
+def prediction_interval(
+    mean: np.ndarray, std: np.ndarray, level: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """Central `level` prediction interval, with spending floored at zero."""
+    z = NormalDist().inv_cdf(0.5 + level / 2)
+    return np.maximum(mean - z * std, 0), mean + z * std
+
+
+def interval_confidence(mean: float, lower: float, upper: float) -> float:
+    """1 minus the interval's half-width relative to the forecast, in [0, 1]."""
+    if mean <= 0:
+        return 0.0
+    return float(np.clip(1 - (upper - lower) / 2 / mean, 0, 1))
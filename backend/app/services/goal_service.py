@@ -1,16 +1,19 @@
-from supabase import Client
+from supabase import AsyncClient
 from app.models.goal import GoalCreate, GoalUpdate, GoalResponse, ContributionCreate
 from app.core.exceptions import NotFoundException, BadRequestException
+from app.core.cache import bump_data_version
+from app.core.singleflight import coalesce
 
 
 class GoalService:
-    def __init__(self, db: Client):
+    def __init__(self, db: AsyncClient):
         self.db = db
 
+    @coalesce
     async def list_goals(self, user_id: str) -> list[GoalResponse]:
         """List all goals for a user."""
         result = (
-            self.db.table("goals")
+            await self.db.table("goals")
             .select("*")
             .eq("user_id", user_id)
             .order("created_at", desc=True)
@@ -25,17 +28,18 @@ class GoalService:
         data["current_amount"] = 0
         data["status"] = "active"
 
-        result = self.db.table("goals").insert(data).execute()
+        result = await self.db.table("goals").insert(data).execute()
 
         if not result.data:
             raise BadRequestException("Failed to create goal")
+        bump_data_version(user_id)
 
         return result.data[0]
 
     async def get_goal(self, user_id: str, goal_id: str) -> GoalResponse:
         """Get a single goal."""
         result = (
-            self.db.table("goals")
+            await self.db.table("goals")
             .select("*")
             .eq("id", goal_id)
             .eq("user_id", user_id)
@@ -57,7 +61,7 @@ class GoalService:
         data = goal.model_dump(exclude_unset=True)
 
         result = (
-            self.db.table("goals")
+            await self.db.table("goals")
             .update(data)
             .eq("id", goal_id)
             .eq("user_id", user_id)
@@ -66,6 +70,7 @@ class GoalService:
 
         if not result.data:
             raise BadRequestException("Failed to update goal")
+        bump_data_version(user_id)
 
         return result.data[0]
 
@@ -73,9 +78,10 @@ class GoalService:
         """Delete a goal."""
         await self.get_goal(user_id, goal_id)
 
-        self.db.table("goals").delete().eq("id", goal_id).eq(
+        await self.db.table("goals").delete().eq("id", goal_id).eq(
             "user_id", user_id
         ).execute()
+        bump_data_version(user_id)
 
     async def add_contribution(
         self, user_id: str, goal_id: str, contribution: ContributionCreate
@@ -93,7 +99,7 @@ class GoalService:
 
         # Update goal
         result = (
-            self.db.table("goals")
+            await self.db.table("goals")
             .update({"current_amount": new_amount, "status": status})
             .eq("id", goal_id)
             .eq("user_id", user_id)
@@ -102,5 +108,6 @@ class GoalService:
 
         if not result.data:
             raise BadRequestException("Failed to add contribution")
+        bump_data_version(user_id)
 
         return result.data[0]
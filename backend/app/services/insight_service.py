@@ -1,7 +1,12 @@
-from supabase import Client
+from supabase import AsyncClient
 from datetime import datetime, timedelta
+import asyncio
+import hashlib
+from typing import AsyncIterator
 import uuid
 
+import numpy as np
+
 from app.models.insight import (
     SpendingSummary,
     CategorySpending,
@@ -12,66 +17,81 @@ from app.models.insight import (
     SpendingPrediction,
     PredictionBreakdown,
 )
-from app.core.gemini import generate_insight, chat_with_ai
+from app.config import get_settings
+from app.core.cache import StaleWhileRevalidateCache, TTLCache, get_data_version
+from app.core.gemini import generate_insight, chat_with_ai, stream_chat_with_ai
+from app.core.singleflight import coalesce
+from app.services.analytics import ExpenseFrame, percentages
+from app.services.forecasting import (
+    MIN_HISTORY,
+    forecast,
+    interval_confidence,
+    prediction_interval,
+)
+
+# Spending summaries shared by the summary, tips and chat endpoints
+summary_cache = StaleWhileRevalidateCache(
+    "spending_summary",
+    max_entries=get_settings().summary_cache_max_entries,
+    ttl_seconds=get_settings().summary_cache_ttl_seconds,
+    stale_seconds=get_settings().summary_cache_stale_seconds,
+)
+
+# Gemini tips keyed by a fingerprint of the prompt context
+tips_cache = TTLCache(
+    "spending_tips",
+    max_entries=get_settings().tips_cache_max_entries,
+    ttl_seconds=get_settings().tips_cache_ttl_seconds,
+)
 
 
 class InsightService:
-    def __init__(self, db: Client):
+    def __init__(self, db: AsyncClient):
         self.db = db
 
+    @coalesce
     async def get_spending_summary(
         self, user_id: str, period: str = "month"
     ) -> SpendingSummary:
-        """Get spending summary for the specified period."""
+        """Get spending summary for the specified period.
+
+        Summaries are cached per data version, so any expense write forces a
+        recompute; otherwise a recently expired summary is served while it
+        refreshes in the background.
+        """
+        return await summary_cache.get_or_compute(
+            (user_id, period, get_data_version(user_id)),
+            lambda: self._compute_spending_summary(user_id, period),
+        )
+
+    async def _compute_spending_summary(
+        self, user_id: str, period: str
+    ) -> SpendingSummary:
+        """Compute the spending summary from the period's expenses."""
         start_date, end_date = self._get_period_dates(period)
         prev_start, prev_end = self._get_previous_period_dates(period)
 
-        # Get current period expenses
-        current_expenses = (
-            self.db.table("expenses")
-            .select("*, category:categories(id, name, color)")
-            .eq("user_id", user_id)
-            .gte("date", start_date)
-            .lte("date", end_date)
-            .execute()
-        ).data
-
-        # Get previous period expenses for comparison
-        previous_expenses = (
-            self.db.table("expenses")
-            .select("amount")
-            .eq("user_id", user_id)
-            .gte("date", prev_start)
-            .lte("date", prev_end)
-            .execute()
-        ).data
+        # Current period expenses for the category breakdown, and only the
+        # previous period's total for the comparison, fetched concurrently
+        current, previous_result = await asyncio.gather(
+            ExpenseFrame.fetch(self.db, user_id, start_date, end_date),
+            self.db.rpc(
+                "get_spending_total",
+                {
+                    "p_user_id": user_id,
+                    "p_start_date": prev_start,
+                    "p_end_date": prev_end,
+                    "p_use_rollup": get_settings().use_daily_spend_rollup,
+                },
+            ).execute(),
+        )
 
         # Calculate totals
-        total_spent = sum(e["amount"] for e in current_expenses)
-        previous_spent = sum(e["amount"] for e in previous_expenses)
+        total_spent = current.total
+        previous_spent = float(previous_result.data or 0)
 
         # Calculate category breakdown
-        category_totals = {}
-        for expense in current_expenses:
-            cat_id = expense["category_id"]
-            if cat_id not in category_totals:
-                category_totals[cat_id] = {
-                    "category_id": cat_id,
-                    "category_name": expense["category"]["name"] if expense["category"] else "Unknown",
-                    "category_color": expense["category"]["color"] if expense["category"] else "#6b7280",
-                    "amount": 0,
-                    "transaction_count": 0,
-                }
-            category_totals[cat_id]["amount"] += expense["amount"]
-            category_totals[cat_id]["transaction_count"] += 1
-
-        # Calculate percentages and sort
-        top_categories = []
-        for cat in category_totals.values():
-            cat["percentage"] = round((cat["amount"] / total_spent) * 100, 2) if total_spent > 0 else 0
-            top_categories.append(CategorySpending(**cat))
-
-        top_categories.sort(key=lambda x: x.amount, reverse=True)
+        top_categories = self._top_categories(current, total_spent)
 
         # Calculate comparison
         change_percentage = 0
@@ -88,7 +108,7 @@ class InsightService:
             total_spent=total_spent,
             total_income=0,  # Would need income tracking
             net_balance=-total_spent,
-            top_categories=top_categories[:5],
+            top_categories=top_categories,
             comparison=SpendingComparison(
                 previous_period=previous_spent,
                 change_percentage=change_percentage,
@@ -96,8 +116,39 @@ class InsightService:
             ),
         )
 
-    async def get_spending_tips(self, user_id: str) -> list[AIInsight]:
-        """Get AI-generated spending tips."""
+    @staticmethod
+    def _top_categories(
+        expenses: ExpenseFrame, total_spent: float, limit: int = 5
+    ) -> list[CategorySpending]:
+        """Categories with the highest spending, largest first."""
+        sums = expenses.category_sums()
+        counts = expenses.category_counts()
+        shares = percentages(sums, total_spent)
+
+        top_categories = []
+        for code in np.argsort(-sums, kind="stable")[:limit]:
+            category = expenses.categories[code]
+            top_categories.append(
+                CategorySpending(
+                    category_id=category["id"],
+                    category_name=category["name"] or "Unknown",
+                    category_color=category["color"] or "#6b7280",
+                    amount=float(sums[code]),
+                    percentage=round(float(shares[code]), 2),
+                    transaction_count=int(counts[code]),
+                )
+            )
+        return top_categories
+
+    @coalesce
+    async def get_spending_tips(
+        self, user_id: str, refresh: bool = False
+    ) -> list[AIInsight]:
+        """Get AI-generated spending tips.
+
+        Tips are reused while the figures in the prompt are unchanged;
+        refresh asks Gemini again regardless.
+        """
         summary = await self.get_spending_summary(user_id, "month")
 
         # Build context for AI
@@ -108,6 +159,12 @@ class InsightService:
         - Spending trend compared to last month: {summary.comparison.trend} ({summary.comparison.change_percentage}%)
         """
 
+        cache_key = (user_id, hashlib.sha256(context.encode("utf-8")).hexdigest())
+        if not refresh:
+            cached = tips_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         prompt = f"""
         Based on this financial data, provide 3-4 personalized, actionable tips to help the user improve their financial health.
 
@@ -125,6 +182,8 @@ class InsightService:
         try:
             response = await generate_insight(prompt)
             tips = self._parse_tips(response)
+            if tips:
+                tips_cache.set(cache_key, tips)
         except Exception:
             # Fallback tips if AI fails
             tips = [
@@ -153,70 +212,110 @@ class InsightService:
     ) -> ChatResponse:
         """Chat with AI about finances."""
         summary = await self.get_spending_summary(user_id, "month")
+        messages = self._chat_messages(message, history)
 
-        context = f"""
+        response = await chat_with_ai(messages, self._chat_context(summary))
+
+        return ChatResponse(
+            message=response,
+            timestamp=datetime.now(),
+        )
+
+    async def chat_stream(
+        self, user_id: str, message: str, history: list[ChatMessage]
+    ) -> AsyncIterator[str]:
+        """Chat with AI about finances, returning the reply as a text stream.
+
+        The summary is loaded before returning, so its errors surface as a
+        normal error response rather than in the middle of the stream.
+        """
+        summary = await self.get_spending_summary(user_id, "month")
+        messages = self._chat_messages(message, history)
+
+        return stream_chat_with_ai(messages, self._chat_context(summary))
+
+    @staticmethod
+    def _chat_context(summary: SpendingSummary) -> str:
+        return f"""
         User's financial snapshot:
         - Monthly spending: ${summary.total_spent:.2f}
         - Top expense categories: {', '.join([f'{c.category_name}: ${c.amount:.2f}' for c in summary.top_categories[:3]])}
         - Spending trend: {summary.comparison.trend} ({summary.comparison.change_percentage}% vs last month)
         """
 
+    @staticmethod
+    def _chat_messages(message: str, history: list[ChatMessage]) -> list[dict]:
         messages = [{"role": m.role, "content": m.content} for m in history]
         messages.append({"role": "user", "content": message})
+        return messages
 
-        response = await chat_with_ai(messages, context)
+    @coalesce
+    async def get_predictions(self, user_id: str) -> SpendingPrediction:
+        """Forecast next month's spending, in total and per category.
 
-        return ChatResponse(
-            message=response,
-            timestamp=datetime.now(),
+        Each category's monthly totals over the last forecast_history_months
+        complete months are fitted together by the exponential-smoothing
+        models in app.services.forecasting.
+        """
+        settings = get_settings()
+        months = settings.forecast_history_months
+        this_month = np.datetime64(datetime.now().date(), "M")
+        first_month = this_month - months
+
+        expenses = await ExpenseFrame.fetch(
+            self.db,
+            user_id,
+            str(first_month.astype("datetime64[D]")),
+            str(this_month.astype("datetime64[D]") - 1),
         )
-
-    async def get_predictions(self, user_id: str) -> SpendingPrediction:
-        """Get spending predictions for next month."""
-        # Get last 3 months of data for prediction
-        today = datetime.now()
-        three_months_ago = today - timedelta(days=90)
-
-        expenses = (
-            self.db.table("expenses")
-            .select("*, category:categories(id, name)")
-            .eq("user_id", user_id)
-            .gte("date", three_months_ago.strftime("%Y-%m-%d"))
-            .execute()
-        ).data
-
-        # Calculate average monthly spending
-        total = sum(e["amount"] for e in expenses)
-        monthly_average = total / 3 if total > 0 else 0
-
-        # Calculate by category
-        category_totals = {}
-        for expense in expenses:
-            cat_id = expense["category_id"]
-            if cat_id not in category_totals:
-                category_totals[cat_id] = {
-                    "category_id": cat_id,
-                    "category_name": expense["category"]["name"] if expense["category"] else "Unknown",
-                    "total": 0,
-                }
-            category_totals[cat_id]["total"] += expense["amount"]
+        series = expenses.category_month_sums(first_month, months)
+        # History starts at the user's first month with any spending
+        active = np.flatnonzero(series.sum(axis=0))
+        series = series[:, active[0] :] if len(active) else series[:, :0]
+
+        lower = upper = None
+        total_lower = total_upper = None
+        if series.shape[1] >= MIN_HISTORY:
+            # The last complete month is two months before the one forecast;
+            # the total is fitted as a series of its own for its interval
+            mean, std = forecast(
+                np.vstack([series, series.sum(axis=0)]),
+                horizon=2,
+                seasonal=settings.forecast_seasonal,
+            )
+            predicted = mean[:-1]
+            lower, upper = prediction_interval(predicted, std[:-1], settings.forecast_interval)
+            total = float(predicted.sum())
+            total_lower, total_upper = (
+                float(bound)
+                for bound in prediction_interval(total, std[-1], settings.forecast_interval)
+            )
+            confidence = interval_confidence(total, total_lower, total_upper)
+        else:
+            # Too little history to fit: the average month, without bounds
+            predicted = series.mean(axis=1) if series.shape[1] else np.zeros(len(series))
+            total = float(predicted.sum())
+            confidence = 0.0
 
         breakdown = [
             PredictionBreakdown(
-                category_id=cat["category_id"],
-                category_name=cat["category_name"],
-                predicted_amount=round(cat["total"] / 3, 2),
+                category_id=expenses.categories[code]["id"],
+                category_name=expenses.categories[code]["name"] or "Unknown",
+                predicted_amount=round(float(predicted[code]), 2),
+                lower_bound=None if lower is None else round(float(lower[code]), 2),
+                upper_bound=None if upper is None else round(float(upper[code]), 2),
             )
-            for cat in category_totals.values()
+            for code in np.argsort(-predicted, kind="stable")
+            if round(float(predicted[code]), 2) > 0
         ]
 
-        next_month = (today.replace(day=1) + timedelta(days=32)).replace(day=1)
-
         return SpendingPrediction(
-            period=next_month.strftime("%B %Y"),
-            predicted_amount=round(monthly_average, 2),
-            confidence=0.75,  # Simplified confidence
-            breakdown=sorted(breakdown, key=lambda x: x.predicted_amount, reverse=True),
+            period=(this_month + 1).astype(object).strftime("%B %Y"),
+            predicted_amount=round(total, 2),
+            lower_bound=None if total_lower is None else round(total_lower, 2),
+            upper_bound=None if total_upper is None else round(total_upper, 2),
+            confidence=round(confidence, 2),
+            breakdown=breakdown,
         )
 
     def _get_period_dates(self, period: str) -> tuple[str, str]:
@@ -0,0 +1,65 @@
+"""PDF layout for expense exports.
+
+Runs inside render pool worker processes, so it only depends on reportlab
+and takes plain picklable rows rather than service objects.
+"""
+import io
+
+# Rows per LongTable; smaller tables keep layout cost linear in row count
+TABLE_CHUNK_ROWS = 500
+
+HEADER = ["Date", "Category", "Description", "Amount"]
+
+
+def render_expense_pdf(
+    title: str, total: float, rows: list[tuple[str, str, str, float]]
+) -> bytes:
+    """Render (date, category, description, amount) rows as a PDF report."""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, LongTable, TableStyle, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = getSampleStyleSheet()
+    elements = []
+
+    # Title
+    elements.append(Paragraph(title, styles["Heading1"]))
+    elements.append(Spacer(1, 20))
+
+    # Summary
+    elements.append(Paragraph(f"Total Expenses: ${total:.2f}", styles["Normal"]))
+    elements.append(Spacer(1, 20))
+
+    # Table, split into chunks that flow across pages with a repeated header
+    style = TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, 0), 12),
+        ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+        ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
+        ("GRID", (0, 0), (-1, -1), 1, colors.black),
+    ])
+    # Fixed widths skip measuring every cell to size the columns
+    col_widths = [80, 110, 220, 80]
+
+    for start in range(0, max(len(rows), 1), TABLE_CHUNK_ROWS):
+        data = [HEADER]
+        for expense_date, category, description, amount in rows[start:start + TABLE_CHUNK_ROWS]:
+            data.append([
+                expense_date,
+                category,
+                description[:30] + "..." if len(description) > 30 else description,
+                f"${amount:.2f}",
+            ])
+
+        table = LongTable(data, colWidths=col_widths, repeatRows=1, splitByRow=1)
+        table.setStyle(style)
+        elements.append(table)
+
+    doc.build(elements)
+    return buffer.getvalue()
@@ -1,213 +1,375 @@
-from supabase import Client
+from supabase import AsyncClient
 from datetime import datetime
+from typing import AsyncIterator, Literal
 import io
 import csv
 
+import numpy as np
+
+from app.config import get_settings
+from app.core.cache import TTLCache, get_data_version
+from app.core.render_pool import run_in_render_pool
+from app.core.singleflight import coalesce
+from app.services.analytics import means, percentages
 from app.models.report import (
     MonthlyReport,
     MonthlyReportItem,
     CategoryReport,
     CategoryBreakdown,
 )
+from app.services.pdf_renderer import render_expense_pdf
+
+# Monthly and category reports, keyed by the user's data version
+report_cache = TTLCache(
+    "report",
+    max_entries=get_settings().report_cache_max_entries,
+    ttl_seconds=get_settings().report_cache_ttl_seconds,
+)
+
+# Rows buffered into each Parquet row group; larger groups compress better
+PARQUET_ROW_GROUP_SIZE = 64 * 1024
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back what was written since the last drain.
+
+    Writers record byte offsets via tell(), so the position keeps counting
+    after the buffered bytes have been sent.
+    """
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
 
 
 class ReportService:
-    def __init__(self, db: Client):
+    def __init__(self, db: AsyncClient):
         self.db = db
 
+    @coalesce
     async def get_monthly_report(
         self, user_id: str, start_date: str, end_date: str
     ) -> MonthlyReport:
         """Get monthly spending report."""
-        expenses = (
-            self.db.table("expenses")
-            .select("*")
-            .eq("user_id", user_id)
-            .gte("date", start_date)
-            .lte("date", end_date)
-            .order("date")
-            .execute()
-        ).data
+        cache_key = ("monthly", user_id, start_date, end_date, get_data_version(user_id))
+        cached = report_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-        # Group by month
-        monthly_data = {}
-        for expense in expenses:
-            month = expense["date"][:7]  # YYYY-MM
-            if month not in monthly_data:
-                monthly_data[month] = {
-                    "month": month,
-                    "total_spent": 0,
-                    "total_income": 0,
-                    "transaction_count": 0,
-                }
-            monthly_data[month]["total_spent"] += expense["amount"]
-            monthly_data[month]["transaction_count"] += 1
+        rows = (
+            await self.db.rpc(
+                "get_monthly_spending",
+                {
+                    "p_user_id": user_id,
+                    "p_start_date": start_date,
+                    "p_end_date": end_date,
+                    "p_use_rollup": get_settings().use_daily_spend_rollup,
+                },
+            ).execute()
+        ).data
 
+        # One row per month, already sorted
         items = []
-        for month_data in sorted(monthly_data.values(), key=lambda x: x["month"]):
-            month_data["net_balance"] = month_data["total_income"] - month_data["total_spent"]
-            items.append(MonthlyReportItem(**month_data))
+        for row in rows:
+            month_spent = float(row["total_spent"])
+            items.append(
+                MonthlyReportItem(
+                    month=row["month"],
+                    total_spent=month_spent,
+                    total_income=0,
+                    net_balance=-month_spent,
+                    transaction_count=row["transaction_count"],
+                )
+            )
 
         total_spent = sum(item.total_spent for item in items)
         total_income = sum(item.total_income for item in items)
         avg_monthly = total_spent / len(items) if items else 0
 
-        return MonthlyReport(
+        report = MonthlyReport(
             period=f"{start_date} to {end_date}",
             data=items,
             total_spent=total_spent,
             total_income=total_income,
             average_monthly_spending=round(avg_monthly, 2),
         )
+        report_cache.set(cache_key, report)
+        return report
 
+    @coalesce
     async def get_category_report(
         self, user_id: str, start_date: str, end_date: str
     ) -> CategoryReport:
         """Get category breakdown report."""
-        expenses = (
-            self.db.table("expenses")
-            .select("*, category:categories(id, name, icon, color)")
-            .eq("user_id", user_id)
-            .gte("date", start_date)
-            .lte("date", end_date)
-            .execute()
+        cache_key = ("category", user_id, start_date, end_date, get_data_version(user_id))
+        cached = report_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        rows = (
+            await self.db.rpc(
+                "get_category_spending",
+                {
+                    "p_user_id": user_id,
+                    "p_start_date": start_date,
+                    "p_end_date": end_date,
+                    "p_use_rollup": get_settings().use_daily_spend_rollup,
+                },
+            ).execute()
         ).data
 
-        # Group by category
-        category_data = {}
-        total_spent = 0
-
-        for expense in expenses:
-            cat_id = expense["category_id"]
-            if cat_id not in category_data:
-                category_data[cat_id] = {
-                    "category_id": cat_id,
-                    "category_name": expense["category"]["name"] if expense["category"] else "Unknown",
-                    "category_color": expense["category"]["color"] if expense["category"] else "#6b7280",
-                    "category_icon": expense["category"]["icon"] if expense["category"] else "📦",
-                    "total_amount": 0,
-                    "transaction_count": 0,
-                }
-            category_data[cat_id]["total_amount"] += expense["amount"]
-            category_data[cat_id]["transaction_count"] += 1
-            total_spent += expense["amount"]
-
-        breakdown = []
-        for cat in category_data.values():
-            cat["percentage"] = round((cat["total_amount"] / total_spent) * 100, 2) if total_spent > 0 else 0
-            cat["average_per_transaction"] = round(
-                cat["total_amount"] / cat["transaction_count"], 2
-            ) if cat["transaction_count"] > 0 else 0
-            breakdown.append(CategoryBreakdown(**cat))
-
-        breakdown.sort(key=lambda x: x.total_amount, reverse=True)
-
-        return CategoryReport(
+        # One row per category, already sorted by total
+        totals = np.array([float(row["total_amount"]) for row in rows], dtype=np.float64)
+        counts = np.array([row["transaction_count"] for row in rows], dtype=np.int64)
+        total_spent = float(totals.sum())
+        shares = percentages(totals, total_spent)
+        averages = means(totals, counts)
+
+        breakdown = [
+            CategoryBreakdown(
+                category_id=row["category_id"],
+                category_name=row["category_name"] or "Unknown",
+                category_color=row["category_color"] or "#6b7280",
+                category_icon=row["category_icon"] or "📦",
+                total_amount=float(totals[i]),
+                percentage=round(float(shares[i]), 2),
+                transaction_count=int(counts[i]),
+                average_per_transaction=round(float(averages[i]), 2),
+            )
+            for i, row in enumerate(rows)
+        ]
+
+        report = CategoryReport(
             period=f"{start_date} to {end_date}",
             breakdown=breakdown,
             total_spent=total_spent,
         )
+        report_cache.set(cache_key, report)
+        return report
+
+    async def iter_expenses(
+        self,
+        user_id: str,
+        start_date: str,
+        end_date: str,
+        columns: str = "id, date, description, amount, payment_method, category:categories(name)",
+    ) -> AsyncIterator[list[dict]]:
+        """Yield the user's expenses in a date range page by page, newest first.
 
-    async def export_csv(
+        Pages follow the (date, id) keyset, so each request is an index seek
+        however deep the export is. Paging stops on an empty page rather than
+        a short one: PostgREST's max-rows cap can return fewer rows than asked
+        for while more remain.
+        """
+        page_size = get_settings().export_page_size
+        last = None
+
+        while True:
+            query = (
+                self.db.table("expenses")
+                .select(columns)
+                .eq("user_id", user_id)
+                .gte("date", start_date)
+                .lte("date", end_date)
+            )
+            if last:
+                last_date, last_id = last
+                query = query.lte("date", last_date).or_(
+                    f"date.lt.{last_date},and(date.eq.{last_date},id.lt.{last_id})"
+                )
+
+            rows = (
+                await query.order("date", desc=True)
+                .order("id", desc=True)
+                .limit(page_size)
+                .execute()
+            ).data
+            if not rows:
+                return
+
+            yield rows
+            last = rows[-1]["date"], rows[-1]["id"]
+
+    def export_csv(
         self, user_id: str, start_date: str, end_date: str
-    ) -> tuple[bytes, str]:
-        """Export expenses as CSV."""
-        expenses = (
-            self.db.table("expenses")
-            .select("*, category:categories(name)")
-            .eq("user_id", user_id)
-            .gte("date", start_date)
-            .lte("date", end_date)
-            .order("date", desc=True)
-            .execute()
-        ).data
+    ) -> tuple[AsyncIterator[bytes], str]:
+        """Export expenses as a stream of CSV chunks."""
+        filename = f"expenses_{start_date}_to_{end_date}.csv"
+        pages = self.iter_expenses(user_id, start_date, end_date)
+        return self._csv_chunks(pages), filename
+
+    def export_columnar(
+        self,
+        user_id: str,
+        start_date: str,
+        end_date: str,
+        format: Literal["parquet", "arrow"],
+    ) -> tuple[AsyncIterator[bytes], str]:
+        """Export expenses as a stream of zstd-compressed Parquet or Arrow IPC."""
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError(
+                "Parquet and Arrow export require pyarrow. Install it with: pip install pyarrow"
+            )
 
+        pages = self.iter_expenses(user_id, start_date, end_date)
+        if format == "parquet":
+            filename = f"expenses_{start_date}_to_{end_date}.parquet"
+            return self._parquet_chunks(pages), filename
+
+        filename = f"expenses_{start_date}_to_{end_date}.arrows"
+        return self._arrow_chunks(pages), filename
+
+    @staticmethod
+    async def _csv_chunks(pages: AsyncIterator[list[dict]]) -> AsyncIterator[bytes]:
+        """Encode each page of expenses as soon as it arrives."""
         output = io.StringIO()
         writer = csv.writer(output)
 
         # Header
         writer.writerow(["Date", "Category", "Description", "Amount", "Payment Method"])
 
-        # Data
-        for expense in expenses:
-            writer.writerow([
-                expense["date"],
-                expense["category"]["name"] if expense["category"] else "Unknown",
-                expense["description"],
-                expense["amount"],
-                expense["payment_method"],
-            ])
-
-        content = output.getvalue().encode("utf-8")
-        filename = f"expenses_{start_date}_to_{end_date}.csv"
+        # Data, one chunk per page
+        async for expenses in pages:
+            for expense in expenses:
+                writer.writerow([
+                    expense["date"],
+                    expense["category"]["name"] if expense["category"] else "Unknown",
+                    expense["description"],
+                    expense["amount"],
+                    expense["payment_method"],
+                ])
+            yield output.getvalue().encode("utf-8")
+            output.seek(0)
+            output.truncate()
 
-        return content, filename
+        if output.tell():
+            yield output.getvalue().encode("utf-8")
+
+    @staticmethod
+    def _arrow_schema():
+        """Typed columns shared by the Parquet and Arrow exports."""
+        import pyarrow as pa
+
+        return pa.schema([
+            ("date", pa.date32()),
+            ("category", pa.dictionary(pa.int32(), pa.string())),
+            ("description", pa.string()),
+            ("amount", pa.decimal128(12, 2)),
+            ("payment_method", pa.dictionary(pa.int32(), pa.string())),
+        ])
+
+    @staticmethod
+    def _record_batch(expenses: list[dict], schema):
+        """Convert one page of expenses into an Arrow record batch."""
+        import pyarrow as pa
+
+        # Parse and cast column-wise in Arrow rather than per row in Python;
+        # amounts are NUMERIC(12, 2) so the float-to-decimal cast is exact
+        columns = [
+            pa.array([e["date"] for e in expenses], pa.string()).cast(pa.date32()),
+            pa.array(
+                [e["category"]["name"] if e["category"] else "Unknown" for e in expenses],
+                pa.string(),
+            ).dictionary_encode(),
+            pa.array([e["description"] for e in expenses], pa.string()),
+            pa.array([e["amount"] for e in expenses], pa.float64()).cast(
+                pa.decimal128(12, 2)
+            ),
+            pa.array([e["payment_method"] for e in expenses], pa.string()).dictionary_encode(),
+        ]
+        return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+    @classmethod
+    async def _arrow_chunks(cls, pages: AsyncIterator[list[dict]]) -> AsyncIterator[bytes]:
+        """Encode pages as an Arrow IPC stream, one record batch per page."""
+        import pyarrow as pa
+
+        schema = cls._arrow_schema()
+        sink = _ChunkSink()
+        options = pa.ipc.IpcWriteOptions(compression="zstd")
+
+        with pa.ipc.new_stream(sink, schema, options=options) as writer:
+            async for expenses in pages:
+                writer.write_batch(cls._record_batch(expenses, schema))
+                yield sink.drain()
+
+        yield sink.drain()
+
+    @classmethod
+    async def _parquet_chunks(cls, pages: AsyncIterator[list[dict]]) -> AsyncIterator[bytes]:
+        """Encode pages as Parquet, flushing a row group whenever one fills."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = cls._arrow_schema()
+        sink = _ChunkSink()
+        batches = []
+        buffered = 0
+
+        with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+            async for expenses in pages:
+                batches.append(cls._record_batch(expenses, schema))
+                buffered += len(expenses)
+                if buffered >= PARQUET_ROW_GROUP_SIZE:
+                    writer.write_table(
+                        pa.Table.from_batches(batches), row_group_size=buffered
+                    )
+                    batches, buffered = [], 0
+                    yield sink.drain()
+
+            if batches:
+                writer.write_table(pa.Table.from_batches(batches), row_group_size=buffered)
+
+        yield sink.drain()
 
     async def export_pdf(
         self, user_id: str, start_date: str, end_date: str
     ) -> tuple[bytes, str]:
-        """Export expenses as PDF."""
+        """Export expenses as PDF, rendered in the render process pool."""
         try:
-            from reportlab.lib import colors
-            from reportlab.lib.pagesizes import letter
-            from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-            from reportlab.lib.styles import getSampleStyleSheet
+            import reportlab  # noqa: F401
         except ImportError:
             raise ImportError(
                 "PDF export requires reportlab. Install it with: pip install reportlab"
             )
 
-        expenses = (
-            self.db.table("expenses")
-            .select("*, category:categories(name)")
-            .eq("user_id", user_id)
-            .gte("date", start_date)
-            .lte("date", end_date)
-            .order("date", desc=True)
-            .execute()
-        ).data
+        # Plain tuples keep the payload sent to the worker small
+        rows = []
+        total = 0.0
+        async for expenses in self.iter_expenses(user_id, start_date, end_date):
+            for expense in expenses:
+                rows.append((
+                    expense["date"],
+                    expense["category"]["name"] if expense["category"] else "Unknown",
+                    expense["description"],
+                    expense["amount"],
+                ))
+                total += expense["amount"]
 
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        styles = getSampleStyleSheet()
-        elements = []
-
-        # Title
-        title = Paragraph(f"Expense Report: {start_date} to {end_date}", styles["Heading1"])
-        elements.append(title)
-        elements.append(Spacer(1, 20))
-
-        # Summary
-        total = sum(e["amount"] for e in expenses)
-        summary = Paragraph(f"Total Expenses: ${total:.2f}", styles["Normal"])
-        elements.append(summary)
-        elements.append(Spacer(1, 20))
-
-        # Table
-        data = [["Date", "Category", "Description", "Amount"]]
-        for expense in expenses:
-            data.append([
-                expense["date"],
-                expense["category"]["name"] if expense["category"] else "Unknown",
-                expense["description"][:30] + "..." if len(expense["description"]) > 30 else expense["description"],
-                f"${expense['amount']:.2f}",
-            ])
-
-        table = Table(data)
-        table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("FONTSIZE", (0, 0), (-1, 0), 12),
-            ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-            ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
-            ("GRID", (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(table)
-
-        doc.build(elements)
-        content = buffer.getvalue()
+        content = await run_in_render_pool(
+            render_expense_pdf,
+            f"Expense Report: {start_date} to {end_date}",
+            total,
+            rows,
+        )
         filename = f"expenses_{start_date}_to_{end_date}.pdf"
 
         return content, filename
@@ -0,0 +1,36 @@
+from supabase import AsyncClient
+
+
+class RollupService:
+    def __init__(self, db: AsyncClient):
+        self.db = db
+
+    async def check_daily_spend(self, user_id: str) -> list[dict]:
+        """List rollup rows that disagree with the user's raw expenses."""
+        result = await self.db.rpc(
+            "check_daily_spend", {"p_user_id": user_id}
+        ).execute()
+        return result.data
+
+    async def rebuild_daily_spend(self, user_id: str) -> int:
+        """Recompute the user's rollup from raw expenses."""
+        result = await self.db.rpc(
+            "rebuild_daily_spend", {"p_user_id": user_id}
+        ).execute()
+        return result.data
+
+    async def verify_daily_spend(self, user_id: str, repair: bool = True) -> dict:
+        """Diff the rollup against raw data and optionally rebuild it."""
+        mismatches = await self.check_daily_spend(user_id)
+        report = {
+            "user_id": user_id,
+            "mismatches": mismatches,
+            "rebuilt_rows": 0,
+            "remaining_mismatches": len(mismatches),
+        }
+
+        if mismatches and repair:
+            report["rebuilt_rows"] = await self.rebuild_daily_spend(user_id)
+            report["remaining_mismatches"] = len(await self.check_daily_spend(user_id))
+
+        return report
@@ -0,0 +1,138 @@
+"""Category aggregation: per-row dict loops vs NumPy group-bys.
+
+Usage (from backend/):
+    python -m benchmarks.analytics_benchmark [rows ...]
+
+Times the spending summary's category breakdown and the per-category
+totals behind predictions on synthetic expenses. The previous path parses
+one JSON object per row (as PostgREST returns them) and loops over the
+dicts; the new one parses the column-wise get_expense_columns payload
+into an ExpenseFrame. Both timings include JSON parsing, and both paths
+must produce the same figures.
+"""
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+
+from app.models.insight import CategorySpending
+from app.services.analytics import ExpenseFrame
+from app.services.insight_service import InsightService
+
+REPEAT = 5
+CATEGORIES = 24
+EPOCH = date(1970, 1, 1)
+
+
+def make_payloads(count: int) -> tuple[str, str]:
+    """The same expenses as PostgREST rows and as get_expense_columns output."""
+    rng = random.Random(11)
+    categories = [
+        {"id": str(uuid.UUID(int=i + 1)), "name": f"Category {i}", "color": "#3b82f6"}
+        for i in range(CATEGORIES)
+    ]
+    start = date(2020, 1, 1)
+    rows = []
+    columns = {"amount": [], "day": [], "category": [], "categories": categories}
+    for i in range(count):
+        code = rng.randrange(CATEGORIES)
+        amount = round(rng.uniform(1, 300), 2)
+        day = start + timedelta(days=i * 2000 // count)
+        rows.append({
+            "amount": amount,
+            "category_id": categories[code]["id"],
+            "category": {"name": categories[code]["name"], "color": categories[code]["color"]},
+        })
+        columns["amount"].append(amount)
+        columns["day"].append((day - EPOCH).days)
+        columns["category"].append(code)
+    return json.dumps(rows), json.dumps(columns)
+
+
+def loop_top_categories(payload: str) -> list[CategorySpending]:
+    """The previous summary breakdown."""
+    expenses = json.loads(payload)
+    total_spent = sum(e["amount"] for e in expenses)
+    category_totals = {}
+    for expense in expenses:
+        cat_id = expense["category_id"]
+        if cat_id not in category_totals:
+            category_totals[cat_id] = {
+                "category_id": cat_id,
+                "category_name": expense["category"]["name"] if expense["category"] else "Unknown",
+                "category_color": expense["category"]["color"] if expense["category"] else "#6b7280",
+                "amount": 0,
+                "transaction_count": 0,
+            }
+        category_totals[cat_id]["amount"] += expense["amount"]
+        category_totals[cat_id]["transaction_count"] += 1
+
+    top_categories = []
+    for cat in category_totals.values():
+        cat["percentage"] = round((cat["amount"] / total_spent) * 100, 2) if total_spent > 0 else 0
+        top_categories.append(CategorySpending(**cat))
+    top_categories.sort(key=lambda x: x.amount, reverse=True)
+    return top_categories[:5]
+
+
+def frame_top_categories(payload: str) -> list[CategorySpending]:
+    frame = ExpenseFrame(json.loads(payload))
+    return InsightService._top_categories(frame, frame.total)
+
+
+def loop_category_totals(payload: str) -> dict[str, float]:
+    """The previous per-category totals for predictions."""
+    totals = {}
+    for expense in json.loads(payload):
+        totals[expense["category_id"]] = totals.get(expense["category_id"], 0) + expense["amount"]
+    return totals
+
+
+def frame_category_totals(payload: str) -> dict[str, float]:
+    frame = ExpenseFrame(json.loads(payload))
+    return {c["id"]: total for c, total in zip(frame.categories, frame.category_sums().tolist())}
+
+
+def best_of(fn, payload: str) -> tuple[float, object]:
+    timings = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        result = fn(payload)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000, result
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 50_000, 200_000]
+    print(f"{CATEGORIES} categories, best of {REPEAT}, JSON parsing included")
+    print(
+        f"{'rows':>8} {'aggregation':>16} {'loops':>10} {'numpy':>10} {'speedup':>8}"
+        f" {'row JSON':>10} {'column JSON':>12}"
+    )
+    for size in sizes:
+        rows_json, columns_json = make_payloads(size)
+        for name, loop, vectorized in (
+            ("top categories", loop_top_categories, frame_top_categories),
+            ("category totals", loop_category_totals, frame_category_totals),
+        ):
+            loop_ms, expected = best_of(loop, rows_json)
+            numpy_ms, actual = best_of(vectorized, columns_json)
+            if isinstance(expected, dict):
+                assert expected.keys() == actual.keys()
+                assert all(abs(expected[k] - actual[k]) < 1e-6 for k in expected)
+            else:
+                assert [(c.category_id, c.transaction_count, c.percentage) for c in expected] == [
+                    (c.category_id, c.transaction_count, c.percentage) for c in actual
+                ]
+                assert all(abs(a.amount - b.amount) < 1e-6 for a, b in zip(expected, actual))
+            print(
+                f"{size:>8} {name:>16} {loop_ms:>7.1f} ms {numpy_ms:>7.1f} ms"
+                f" {loop_ms / numpy_ms:>7.1f}x {len(rows_json) / 1e6:>7.1f} MB"
+                f" {len(columns_json) / 1e6:>9.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
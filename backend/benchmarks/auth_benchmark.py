@@ -0,0 +1,93 @@
+"""Per-request authentication cost: local JWT verification vs auth.get_user.
+
+Usage (from backend/):
+    python -m benchmarks.auth_benchmark
+
+Local verification runs offline against a self-signed token. Set
+BENCH_ACCESS_TOKEN to a real access token (with SUPABASE_URL and
+SUPABASE_SERVICE_KEY in .env) to also time the remote round trip.
+"""
+import asyncio
+import os
+import statistics
+import time
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from app.config import get_settings
+from app.core.security import (
+    get_jwks_cache,
+    verify_token_locally,
+    verify_token_remotely,
+)
+
+ITERATIONS = 2000
+REMOTE_ITERATIONS = 20
+
+
+def make_claims(issuer: str) -> dict:
+    now = int(time.time())
+    return {
+        "sub": "00000000-0000-0000-0000-000000000001",
+        "email": "bench@example.com",
+        "user_metadata": {"full_name": "Bench User"},
+        "aud": "authenticated",
+        "iss": issuer,
+        "iat": now,
+        "exp": now + 3600,
+        "role": "authenticated",
+    }
+
+
+async def time_calls(verify, token: str, iterations: int) -> list[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await verify(token)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label: str, samples: list[float]) -> None:
+    samples.sort()
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(
+        f"{label:<22} mean={statistics.mean(samples):8.3f} ms  "
+        f"p50={statistics.median(samples):8.3f} ms  p99={p99:8.3f} ms"
+    )
+
+
+async def main() -> None:
+    settings = get_settings()
+    if not settings.supabase_url:
+        settings.supabase_url = "https://bench.supabase.co"
+    issuer = f"{settings.supabase_url}/auth/v1"
+
+    # HS256 with the project secret
+    settings.supabase_jwt_secret = settings.supabase_jwt_secret or "bench-secret" * 4
+    hs_token = jwt.encode(make_claims(issuer), settings.supabase_jwt_secret, "HS256")
+    report("local HS256", await time_calls(verify_token_locally, hs_token, ITERATIONS))
+
+    # ES256 against a pre-populated JWKS cache
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    public_jwk = jwt.algorithms.ECAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    public_jwk.update({"kid": "bench", "alg": "ES256", "use": "sig"})
+    get_jwks_cache()._keys = {"bench": jwt.PyJWK(public_jwk)}
+    es_token = jwt.encode(
+        make_claims(issuer), private_key, "ES256", headers={"kid": "bench"}
+    )
+    report("local ES256 (JWKS)", await time_calls(verify_token_locally, es_token, ITERATIONS))
+
+    remote_token = os.environ.get("BENCH_ACCESS_TOKEN")
+    if remote_token:
+        report(
+            "remote auth.get_user",
+            await time_calls(verify_token_remotely, remote_token, REMOTE_ITERATIONS),
+        )
+    else:
+        print("remote auth.get_user   skipped (set BENCH_ACCESS_TOKEN)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+"""BudgetService.get_budget_status cost for 1, 10 and 50 budgets.
+
+Usage (from backend/):
+    python -m benchmarks.budget_status_benchmark [round_trip_ms]
+
+Runs against an in-process fake PostgREST that adds a fixed delay per
+round trip, and compares the single aggregate call with the previous
+one-query-per-budget pattern.
+"""
+import asyncio
+import sys
+import time
+
+import httpx
+from supabase import AsyncClientOptions, acreate_client
+
+from app.services.budget_service import BudgetService
+
+BUDGET_COUNTS = (1, 10, 50)
+REPEAT = 5
+
+
+def make_budgets(count: int) -> list[dict]:
+    return [
+        {
+            "id": f"budget-{i}",
+            "user_id": "bench-user",
+            "category_id": f"category-{i}" if i else None,
+            "amount": 500.0,
+            "period": "monthly",
+            "start_date": "2024-01-01",
+            "alert_threshold": 80,
+            "created_at": "2024-01-01T00:00:00Z",
+            "updated_at": "2024-01-01T00:00:00Z",
+            "category": None,
+        }
+        for i in range(count)
+    ]
+
+
+async def make_client(budgets: list[dict], round_trip: float, counter: list[int]):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        counter[0] += 1
+        await asyncio.sleep(round_trip)
+        path = request.url.path
+        if path.endswith("/budgets"):
+            return httpx.Response(200, json=budgets)
+        if path.endswith("/rpc/get_budget_spending"):
+            return httpx.Response(
+                200, json=[{"budget_id": b["id"], "spent": 120.0} for b in budgets]
+            )
+        return httpx.Response(200, json=[{"amount": 40.0}] * 3)
+
+    return await acreate_client(
+        "https://bench.supabase.co",
+        "bench-key" * 5,
+        options=AsyncClientOptions(
+            httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        ),
+    )
+
+
+async def per_budget_queries(service: BudgetService, user_id: str) -> None:
+    """The previous implementation: one expenses query per budget."""
+    for budget in await service.list_budgets(user_id):
+        start_date, end_date = service._get_period_dates(
+            budget["period"], budget["start_date"]
+        )
+        query = (
+            service.db.table("expenses")
+            .select("amount")
+            .eq("user_id", user_id)
+            .gte("date", start_date)
+            .lte("date", end_date)
+        )
+        if budget["category_id"]:
+            query = query.eq("category_id", budget["category_id"])
+        await query.execute()
+
+
+async def measure(run, count: int, round_trip: float) -> tuple[float, int]:
+    counter = [0]
+    service = BudgetService(await make_client(make_budgets(count), round_trip, counter))
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        await run(service, "bench-user")
+    elapsed = (time.perf_counter() - start) / REPEAT * 1000
+    return elapsed, counter[0] // REPEAT
+
+
+async def main() -> None:
+    round_trip = float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.005
+    print(f"simulated round trip: {round_trip * 1000:.1f} ms")
+    print(f"{'budgets':>8} {'per-budget':>22} {'aggregate':>22}")
+    for count in BUDGET_COUNTS:
+        legacy_ms, legacy_trips = await measure(per_budget_queries, count, round_trip)
+        new_ms, new_trips = await measure(
+            lambda s, u: s.get_budget_status(u), count, round_trip
+        )
+        print(
+            f"{count:>8} {legacy_ms:>10.1f} ms {legacy_trips:>4} trips"
+            f" {new_ms:>10.1f} ms {new_trips:>4} trips"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+"""Prompt size per chat turn with and without history compaction.
+
+Usage (from backend/):
+    python -m benchmarks.chat_history_benchmark [turns]
+
+Plays a synthetic conversation and, at each turn, compares the estimated
+prompt tokens of the previous request layout (system prompt, an
+acknowledgement and the full history) with the compacted request that
+build_chat_request produces. Token counts use the same characters-per-token
+estimate as the budget, so they show the trend rather than billed tokens;
+gemini_prompt_tokens on /metrics reports the billed figure in production.
+"""
+import random
+import sys
+import time
+
+from app.core.chat_history import estimate_tokens
+from app.core.gemini import build_chat_request, get_settings
+
+CONTEXT = """
+        User's financial snapshot:
+        - Monthly spending: $1834.20
+        - Top expense categories: Groceries: $512.40, Dining: $301.75, Transport: $220.10
+        - Spending trend: up (12.5% vs last month)
+        """
+ACK = "I understand. I'll help you with personalized financial advice based on your spending data."
+WORDS = (
+    "budget groceries dining savings rent transport subscription coffee month "
+    "category spending goal plan reduce track weekly limit emergency fund"
+).split()
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def message(rng: random.Random, role: str) -> dict:
+    sentences = rng.randint(1, 3) if role == "user" else rng.randint(6, 12)
+    return {"role": role, "content": " ".join(sentence(rng, rng.randint(8, 16)) for _ in range(sentences))}
+
+
+def request_tokens(contents, system_instruction: str) -> int:
+    return estimate_tokens(system_instruction) + sum(
+        estimate_tokens(part.text) for content in contents for part in content.parts
+    )
+
+
+def main() -> None:
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 80
+    rng = random.Random(7)
+    settings = get_settings()
+    print(
+        f"recent turns {settings.chat_recent_turns},"
+        f" history budget {settings.chat_history_token_budget} tokens"
+    )
+    print(f"{'turn':>5} {'full history':>13} {'compacted':>10} {'saved':>7} {'build':>9}")
+
+    history: list[dict] = []
+    for turn in range(1, turns + 1):
+        messages = history + [message(rng, "user")]
+
+        started = time.perf_counter()
+        contents, config = build_chat_request(messages, CONTEXT)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        compacted = request_tokens(contents, config.system_instruction)
+        full = estimate_tokens(config.system_instruction) + estimate_tokens(ACK) + sum(
+            estimate_tokens(m["content"]) for m in messages
+        )
+        if turn in (1, 5, 10, 20, 40, 80) or turn == turns:
+            print(
+                f"{turn:>5} {full:>13} {compacted:>10} {1 - compacted / full:>6.0%}"
+                f" {build_ms:>6.2f} ms"
+            )
+        history = messages + [message(rng, "assistant")]
+
+
+if __name__ == "__main__":
+    main()
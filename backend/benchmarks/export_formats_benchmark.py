@@ -0,0 +1,77 @@
+"""Export time and size for CSV, Parquet and Arrow IPC over 1M rows.
+
+Usage (from backend/):
+    python -m benchmarks.export_formats_benchmark [rows]
+
+Feeds synthetic pages straight into the ReportService encoders, so the
+figures cover encoding and compression only, not the PostgREST fetch that
+all formats share. Requires pyarrow.
+"""
+import asyncio
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from app.services.report_service import ReportService
+
+PAGE_SIZE = 1000
+DISTINCT_PAGES = 100
+CATEGORIES = ["Groceries", "Transport", "Dining", "Utilities", "Entertainment", "Health"]
+MERCHANTS = ["Walmart", "Shell", "Starbucks", "Amazon", "Uber", "CVS", "Netflix"]
+PAYMENT_METHODS = ["credit_card", "debit_card", "cash", "upi"]
+
+
+def make_pages() -> list[list[dict]]:
+    rng = random.Random(42)
+    end = date(2024, 12, 31)
+    pages = []
+    for page in range(DISTINCT_PAGES):
+        pages.append([
+            {
+                "date": (end - timedelta(days=(page * PAGE_SIZE + i) // 30)).isoformat(),
+                "category": {"name": rng.choice(CATEGORIES)},
+                "description": f"{rng.choice(MERCHANTS)} #{rng.randint(1000, 9999)}",
+                "amount": round(rng.uniform(1, 500), 2),
+                "payment_method": rng.choice(PAYMENT_METHODS),
+            }
+            for i in range(PAGE_SIZE)
+        ])
+    return pages
+
+
+async def measure(encode, pages: list[list[dict]], rows: int) -> tuple[float, int]:
+    async def feed():
+        for n in range(rows // PAGE_SIZE):
+            yield pages[n % len(pages)]
+
+    start = time.perf_counter()
+    size = 0
+    async for chunk in encode(feed()):
+        size += len(chunk)
+    return time.perf_counter() - start, size
+
+
+async def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    pages = make_pages()
+    encoders = {
+        "csv": ReportService._csv_chunks,
+        "parquet": ReportService._parquet_chunks,
+        "arrow": ReportService._arrow_chunks,
+    }
+
+    print(f"{rows} rows")
+    print(f"{'format':>8} {'time':>10} {'size':>12} {'vs csv':>8}")
+    csv_size = None
+    for name, encode in encoders.items():
+        elapsed, size = await measure(encode, pages, rows)
+        csv_size = csv_size or size
+        print(
+            f"{name:>8} {elapsed:>8.2f} s {size / 1024 / 1024:>9.1f} MB"
+            f" {size / csv_size:>7.0%}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
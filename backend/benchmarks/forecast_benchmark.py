@@ -0,0 +1,71 @@
+"""Spending forecasts: fit time and accuracy against the flat average.
+
+Usage (from backend/):
+    python -m benchmarks.forecast_benchmark [categories] [months]
+
+Times app.services.forecasting.forecast on synthetic monthly category
+spending (trend, yearly seasonality and noise in varying proportions),
+then backtests it: for each of the last BACKTEST months, forecast two
+months ahead from the history before it, as get_predictions does, and
+compare with the previous prediction, the average of the three months
+before. Reports mean absolute error and how often the actual month fell
+inside the prediction interval.
+"""
+import sys
+import time
+
+import numpy as np
+
+from app.services.forecasting import forecast, prediction_interval
+
+REPEAT = 50
+BACKTEST = 12
+HORIZON = 2
+LEVEL = 0.8
+
+
+def make_series(categories: int, months: int) -> np.ndarray:
+    rng = np.random.default_rng(5)
+    t = np.arange(months)
+    base = rng.uniform(20, 800, (categories, 1))
+    trend = rng.normal(0, 0.01, (categories, 1)) * base * t
+    seasonality = rng.uniform(0, 0.5, (categories, 1)) * base * np.sin(
+        2 * np.pi * (t + rng.integers(0, 12, (categories, 1))) / 12
+    )
+    noise = rng.uniform(0.05, 0.3, (categories, 1)) * base * rng.standard_normal((categories, months))
+    return np.maximum(base + trend + seasonality + noise, 0)
+
+
+def main() -> None:
+    categories = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    months = int(sys.argv[2]) if len(sys.argv) > 2 else 24
+
+    series = make_series(categories, months)
+    forecast(series, HORIZON)
+    timings = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        forecast(series, HORIZON)
+        timings.append(time.perf_counter() - started)
+    print(f"fit {categories} categories x {months} months: {min(timings) * 1000:.2f} ms (best of {REPEAT})")
+
+    history = make_series(categories, months + BACKTEST + HORIZON - 1)
+    errors = {"3-month average": [], "smoothing": []}
+    covered = []
+    for end in range(months, months + BACKTEST):
+        actual = history[:, end + HORIZON - 1]
+        past = history[:, :end]
+        errors["3-month average"].append(np.abs(past[:, -3:].mean(axis=1) - actual))
+        mean, std = forecast(past, HORIZON)
+        lower, upper = prediction_interval(mean, std, LEVEL)
+        errors["smoothing"].append(np.abs(mean - actual))
+        covered.append((lower <= actual) & (actual <= upper))
+
+    print(f"backtest over {BACKTEST} months, {HORIZON} months ahead, from {months} months of history")
+    for name, error in errors.items():
+        print(f"{name:>16}: MAE {np.mean(error):.2f}")
+    print(f"{LEVEL:.0%} interval coverage: {np.mean(covered):.0%}")
+
+
+if __name__ == "__main__":
+    main()
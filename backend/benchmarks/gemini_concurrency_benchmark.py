@@ -0,0 +1,100 @@
+"""Event-loop responsiveness while 20 Gemini chats are in flight.
+
+Usage (from backend/):
+    python -m benchmarks.gemini_concurrency_benchmark [model_delay_ms]
+
+Starts a local fake Gemini server that answers generateContent after a
+fixed delay, then runs 20 concurrent chat_with_ai calls, first with the
+previous blocking client.models call and then through the async client.
+A probe task stands in for other endpoints: it sleeps 5 ms at a time and
+records how late it wakes up.
+"""
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHATS = 20
+PROBE_INTERVAL = 0.005
+MODEL_DELAY = float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.5
+
+
+class FakeGemini(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        time.sleep(MODEL_DELAY)
+        body = json.dumps({
+            "candidates": [{"content": {"role": "model", "parts": [{"text": "Spend less on coffee."}]}}]
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGemini)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+os.environ["GEMINI_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/"
+os.environ.setdefault("GEMINI_API_KEY", "bench-key")
+
+from app.core import gemini  # noqa: E402
+
+
+async def blocking_chat(messages, context):
+    """The previous implementation: the sync client inside a coroutine."""
+    response = gemini.get_gemini_client().models.generate_content(
+        model=gemini.GEMINI_MODEL, contents=messages[-1]["content"]
+    )
+    return response.text
+
+
+async def probe(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append((time.perf_counter() - started - PROBE_INTERVAL) * 1000)
+
+
+async def measure(chat) -> tuple[float, list[float]]:
+    lags: list[float] = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(lags, stop))
+    await asyncio.sleep(0.05)
+
+    messages = [{"role": "user", "content": "How can I save money?"}]
+    started = time.perf_counter()
+    await asyncio.gather(*[chat(messages, "Monthly spending: $1200") for _ in range(CHATS)])
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe_task
+    return elapsed, lags
+
+
+async def main() -> None:
+    settings = gemini.get_settings()
+    print(
+        f"{CHATS} chats, model delay {MODEL_DELAY * 1000:.0f} ms,"
+        f" concurrency cap {settings.gemini_max_concurrency}"
+    )
+    print(f"{'mode':>9} {'all chats':>11} {'lag p50':>10} {'lag p99':>10} {'lag max':>10}")
+    for name, chat in (("blocking", blocking_chat), ("async", gemini.chat_with_ai)):
+        elapsed, lags = await measure(chat)
+        p99 = statistics.quantiles(lags, n=100, method="inclusive")[98] if len(lags) > 1 else lags[0]
+        print(
+            f"{name:>9} {elapsed:>9.2f} s {statistics.median(lags):>7.1f} ms"
+            f" {p99:>7.1f} ms {max(lags):>7.1f} ms"
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""Event-loop latency while a large PDF export renders.
+
+Usage (from backend/):
+    python -m benchmarks.pdf_render_benchmark [rows]
+
+Renders a 50k-row expense PDF either directly on the event loop (the
+previous behaviour) or through the render process pool, while a probe task
+stands in for other requests: it sleeps 5 ms at a time and records how
+late it wakes up. Reports the probe's p50/p99/max lag and render time.
+Requires reportlab.
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+from app.core.render_pool import close_render_pool, init_render_pool, run_in_render_pool
+from app.services.pdf_renderer import render_expense_pdf
+
+PROBE_INTERVAL = 0.005
+
+
+def make_rows(count: int) -> list[tuple[str, str, str, float]]:
+    return [
+        (f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}", "Groceries", f"Expense number {i}", 5 + i % 200 * 0.37)
+        for i in range(count)
+    ]
+
+
+async def probe(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append((time.perf_counter() - started - PROBE_INTERVAL) * 1000)
+
+
+async def measure(render, rows) -> tuple[float, list[float], int]:
+    lags: list[float] = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(lags, stop))
+    await asyncio.sleep(0.1)
+
+    started = time.perf_counter()
+    content = await render(rows)
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe_task
+    return elapsed, lags, len(content)
+
+
+async def inline(rows):
+    return render_expense_pdf("Benchmark", 0.0, rows)
+
+
+async def pooled(rows):
+    return await run_in_render_pool(render_expense_pdf, "Benchmark", 0.0, rows)
+
+
+async def main() -> None:
+    rows = make_rows(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
+    init_render_pool()
+    # Start the workers and import reportlab in them before timing
+    await run_in_render_pool(render_expense_pdf, "warm up", 0.0, rows[:10])
+
+    print(f"{len(rows)} rows")
+    print(f"{'mode':>8} {'render':>10} {'size':>10} {'lag p50':>10} {'lag p99':>10} {'lag max':>10}")
+    for name, render in (("inline", inline), ("pool", pooled)):
+        elapsed, lags, size = await measure(render, rows)
+        p99 = statistics.quantiles(lags, n=100, method="inclusive")[98] if len(lags) > 1 else lags[0]
+        print(
+            f"{name:>8} {elapsed:>8.2f} s {size / 1024 / 1024:>7.1f} MB"
+            f" {statistics.median(lags):>7.1f} ms {p99:>7.1f} ms {max(lags):>7.1f} ms"
+        )
+
+    close_render_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,179 @@
+"""Spending summary fetch: latency and bytes transferred.
+
+Usage (from backend/):
+    python -m benchmarks.summary_query_benchmark [expenses_per_day]
+
+Runs InsightService._compute_spending_summary against an in-process fake
+PostgREST that adds a fixed round-trip time plus transfer time for each
+response body, and compares it with the original fetch: a `*` select of
+the current period and then a row transfer of the previous period, one
+after the other. Response bodies are sized like real rows; the summary
+now reads the current period through the column-wise get_expense_columns
+RPC.
+"""
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+from urllib.parse import parse_qs
+
+import httpx
+from supabase import AsyncClientOptions, acreate_client
+
+from app.services.insight_service import InsightService
+
+ROUND_TRIP = 0.020
+BYTES_PER_SECOND = 10 * 1024 * 1024
+RUNS = 20
+USER_ID = str(uuid.UUID(int=1))
+CATEGORIES = {
+    str(uuid.UUID(int=100 + i)): (name, color)
+    for i, (name, color) in enumerate(
+        [("Groceries", "#22c55e"), ("Dining", "#f97316"), ("Transport", "#3b82f6"), ("Utilities", "#a855f7")]
+    )
+}
+EPOCH = date(1970, 1, 1)
+MERCHANTS = ["Walmart", "Shell", "Starbucks", "Amazon", "Uber", "Costco", "Netflix"]
+
+
+def make_rows(per_day: int) -> list[dict]:
+    rng = random.Random(3)
+    today = date.today()
+    rows = []
+    for day in range(400):
+        for _ in range(per_day):
+            category_id = rng.choice(list(CATEGORIES))
+            merchant = rng.choice(MERCHANTS)
+            rows.append({
+                "id": str(uuid.uuid4()),
+                "user_id": USER_ID,
+                "category_id": category_id,
+                "amount": round(rng.uniform(2, 200), 2),
+                "description": f"{merchant} purchase #{rng.randint(1000, 9999)}",
+                "date": (today - timedelta(days=day)).isoformat(),
+                "payment_method": "credit_card",
+                "receipt_url": None,
+                "created_at": "2024-05-01T12:00:00.000000+00:00",
+                "updated_at": "2024-05-01T12:00:00.000000+00:00",
+            })
+    return rows
+
+
+def project(row: dict, select: str) -> dict:
+    """Apply a PostgREST select of plain columns plus the category embed."""
+    name, color = CATEGORIES[row["category_id"]]
+    columns, _, embed = select.partition("category:")
+    out = {}
+    for column in filter(None, (c.strip() for c in columns.split(","))):
+        out.update(row if column == "*" else {column: row[column]})
+    if embed:
+        fields = {"id": row["category_id"], "name": name, "color": color}
+        wanted = embed[embed.index("(") + 1 : embed.index(")")].split(",")
+        out["category"] = {f.strip(): fields[f.strip()] for f in wanted}
+    return out
+
+
+def expense_columns(rows: list[dict], start: str, end: str) -> dict:
+    """What get_expense_columns returns for rows in [start, end]."""
+    selected = sorted((r for r in rows if start <= r["date"] <= end), key=lambda r: (r["date"], r["id"]))
+    category_ids = sorted({r["category_id"] for r in selected})
+    codes = {category_id: code for code, category_id in enumerate(category_ids)}
+    return {
+        "amount": [r["amount"] for r in selected],
+        "day": [(date.fromisoformat(r["date"]) - EPOCH).days for r in selected],
+        "category": [codes[r["category_id"]] for r in selected],
+        "categories": [
+            {"id": c, "name": CATEGORIES[c][0], "color": CATEGORIES[c][1]} for c in category_ids
+        ],
+    }
+
+
+async def make_client(rows: list[dict], stats: dict):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        params = parse_qs(request.url.query.decode())
+        if request.url.path.endswith("/rpc/get_spending_total"):
+            args = json.loads(request.content)
+            body = json.dumps(round(sum(
+                r["amount"] for r in rows if args["p_start_date"] <= r["date"] <= args["p_end_date"]
+            ), 2))
+        elif request.url.path.endswith("/rpc/get_expense_columns"):
+            args = json.loads(request.content)
+            body = json.dumps(expense_columns(rows, args["p_start_date"], args["p_end_date"]))
+        else:
+            start = next(v[4:] for v in params["date"] if v.startswith("gte."))
+            end = next(v[4:] for v in params["date"] if v.startswith("lte."))
+            select = params["select"][0]
+            body = json.dumps([project(r, select) for r in rows if start <= r["date"] <= end])
+
+        stats["bytes"] += len(body)
+        await asyncio.sleep(ROUND_TRIP + len(body) / BYTES_PER_SECOND)
+        return httpx.Response(200, text=body, headers={"Content-Type": "application/json"})
+
+    return await acreate_client(
+        "https://bench.supabase.co",
+        "bench-key" * 5,
+        options=AsyncClientOptions(
+            httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        ),
+    )
+
+
+async def previous_fetch(service: InsightService, period: str) -> float:
+    """The original queries: both periods' rows, one after the other."""
+    start_date, end_date = service._get_period_dates(period)
+    prev_start, prev_end = service._get_previous_period_dates(period)
+    current = (
+        await service.db.table("expenses")
+        .select("*, category:categories(id, name, color)")
+        .eq("user_id", USER_ID)
+        .gte("date", start_date)
+        .lte("date", end_date)
+        .execute()
+    ).data
+    previous = (
+        await service.db.table("expenses")
+        .select("amount")
+        .eq("user_id", USER_ID)
+        .gte("date", prev_start)
+        .lte("date", prev_end)
+        .execute()
+    ).data
+    return sum(e["amount"] for e in current) + sum(e["amount"] for e in previous)
+
+
+async def measure(fetch, rows: list[dict]) -> tuple[float, int]:
+    stats = {"bytes": 0}
+    service = InsightService(await make_client(rows, stats))
+    await fetch(service)  # warm up the client
+    stats["bytes"] = 0
+    timings = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        await fetch(service)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000, stats["bytes"] // RUNS
+
+
+async def main() -> None:
+    per_day = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    rows = make_rows(per_day)
+    print(
+        f"{per_day} expenses/day, round trip {ROUND_TRIP * 1000:.0f} ms,"
+        f" {BYTES_PER_SECOND / 1024 / 1024:.0f} MB/s"
+    )
+    print(f"{'period':>7} {'fetch':>11} {'latency':>10} {'bytes':>10}")
+    for period in ("month", "year"):
+        for name, fetch in (
+            ("previous", lambda s: previous_fetch(s, period)),
+            ("current", lambda s: s._compute_spending_summary(USER_ID, period)),
+        ):
+            latency, size = await measure(fetch, rows)
+            print(f"{period:>7} {name:>11} {latency:>7.1f} ms {size / 1024:>7.0f} KB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,45 @@
+"""Check the daily_spend rollup against raw expenses and repair drift.
+
+Usage (from backend/):
+    python -m scripts.check_daily_spend <user_id> [<user_id> ...] [--no-repair]
+
+Exits with status 1 if any mismatch remains.
+"""
+import asyncio
+import sys
+
+from app.core.supabase import close_supabase_client, init_supabase_client
+from app.services.rollup_service import RollupService
+
+
+async def main(user_ids: list[str], repair: bool) -> int:
+    service = RollupService(await init_supabase_client())
+    failed = False
+
+    try:
+        for user_id in user_ids:
+            report = await service.verify_daily_spend(user_id, repair=repair)
+            print(
+                f"{user_id}: {len(report['mismatches'])} mismatched rows, "
+                f"{report['rebuilt_rows']} rows rebuilt, "
+                f"{report['remaining_mismatches']} remaining"
+            )
+            for row in report["mismatches"]:
+                print(
+                    f"  {row['date']} {row['category_id']}: "
+                    f"rollup={row['rollup_total']}/{row['rollup_count']} "
+                    f"actual={row['actual_total']}/{row['actual_count']}"
+                )
+            failed = failed or report["remaining_mismatches"] > 0
+    finally:
+        await close_supabase_client()
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if not args:
+        print(__doc__)
+        sys.exit(2)
+    sys.exit(asyncio.run(main(args, repair="--no-repair" not in sys.argv)))
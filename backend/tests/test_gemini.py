@@ -0,0 +1,168 @@
+"""Gemini calls: event-loop responsiveness, concurrency cap and retries."""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+from google import genai
+from google.genai import errors, types
+
+from app.config import get_settings
+from app.core import gemini
+
+CHATS = 20
+MAX_CONCURRENCY = 4
+MODEL_DELAY = 0.3
+PROBE_INTERVAL = 0.005
+
+
+class FakeGemini:
+    """Local generateContent server with a fixed delay and scripted statuses."""
+
+    def __init__(self):
+        self.delay = 0.0
+        self.statuses: list[int] = []
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                with fake._lock:
+                    fake.requests += 1
+                    fake.in_flight += 1
+                    fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+                    status = fake.statuses.pop(0) if fake.statuses else 200
+                try:
+                    time.sleep(fake.delay)
+                    if status == 200:
+                        body = {"candidates": [
+                            {"content": {"role": "model", "parts": [{"text": "Spend less."}]}}
+                        ]}
+                    else:
+                        body = {"error": {"code": status, "message": "fake error", "status": "ERROR"}}
+                    payload = json.dumps(body).encode()
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                finally:
+                    with fake._lock:
+                        fake.in_flight -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    fake = FakeGemini()
+    client = genai.Client(
+        api_key="test-key", http_options=types.HttpOptions(base_url=fake.url, timeout=10_000)
+    )
+    settings = get_settings()
+    monkeypatch.setattr(settings, "gemini_max_concurrency", MAX_CONCURRENCY)
+    monkeypatch.setattr(settings, "gemini_max_retries", 2)
+    monkeypatch.setattr(settings, "gemini_timeout_seconds", 10.0)
+    monkeypatch.setattr(gemini, "get_gemini_client", lambda: client)
+    # The cap is created on first use and bound to that test's event loop
+    monkeypatch.setattr(gemini, "_semaphore", None)
+    monkeypatch.setattr(gemini.random, "uniform", lambda a, b: 0)
+    yield fake
+    fake.server.shutdown()
+
+
+async def probe(lags: list[float], stop: asyncio.Event) -> None:
+    """Stand-in for other requests: how late does a short sleep wake up?"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - started - PROBE_INTERVAL)
+
+
+async def test_concurrent_calls_keep_event_loop_responsive(fake_gemini):
+    fake_gemini.delay = MODEL_DELAY
+    lags: list[float] = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(lags, stop))
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *[gemini.generate_content("How can I save money?") for _ in range(CHATS)]
+    )
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe_task
+
+    assert results == ["Spend less."] * CHATS
+    # A blocking call would stall the probe for a whole model delay
+    assert max(lags) < MODEL_DELAY / 3
+    # and the probe kept waking up while the calls were in flight
+    assert len(lags) > elapsed / PROBE_INTERVAL / 4
+
+
+async def test_concurrent_calls_respect_concurrency_cap(fake_gemini):
+    fake_gemini.delay = MODEL_DELAY / 3
+
+    await asyncio.gather(
+        *[gemini.generate_content("How can I save money?") for _ in range(CHATS)]
+    )
+
+    assert fake_gemini.requests == CHATS
+    assert fake_gemini.max_in_flight == MAX_CONCURRENCY
+    assert gemini.gemini_in_flight.value == 0
+
+
+@pytest.mark.parametrize(
+    "error, transient",
+    [
+        (errors.ClientError(429, {}), True),
+        (errors.ClientError(408, {}), True),
+        (errors.ServerError(500, {}), True),
+        (errors.ServerError(503, {}), True),
+        (errors.ClientError(400, {}), False),
+        (errors.ClientError(401, {}), False),
+        (errors.ClientError(404, {}), False),
+        (TimeoutError(), True),
+        (httpx.ConnectError("refused"), True),
+        (ValueError("bad config"), False),
+    ],
+)
+def test_is_transient(error, transient):
+    assert gemini._is_transient(error) is transient
+
+
+async def test_retries_rate_limit_and_server_errors(fake_gemini):
+    fake_gemini.statuses = [429, 503]
+
+    assert await gemini.generate_content("Hi") == "Spend less."
+    assert fake_gemini.requests == 3
+
+
+async def test_does_not_retry_client_errors(fake_gemini):
+    fake_gemini.statuses = [400]
+
+    with pytest.raises(errors.ClientError) as excinfo:
+        await gemini.generate_content("Hi")
+    assert excinfo.value.code == 400
+    assert fake_gemini.requests == 1
+
+
+async def test_gives_up_after_max_retries(fake_gemini):
+    fake_gemini.statuses = [503, 503, 503, 503]
+
+    with pytest.raises(errors.ServerError):
+        await gemini.generate_content("Hi")
+    assert fake_gemini.requests == 3
@@ -0,0 +1,91 @@
+"""Streaming exports return every row even when PostgREST caps page size."""
+import csv
+import io
+import re
+import uuid
+from datetime import date, timedelta
+from urllib.parse import unquote
+
+import httpx
+import pytest
+from supabase import AsyncClientOptions, acreate_client
+
+from app.config import get_settings
+from app.services.report_service import ReportService
+
+# PostgREST db-max-rows; smaller than the export page size below
+MAX_ROWS = 1000
+PAGE_SIZE = 2000
+EXPENSES_PER_DAY = 10
+END_DATE = date(2024, 12, 31)
+
+
+def make_row(index: int, total: int) -> dict:
+    """Row number `index` in (date desc, id desc) order, built on demand."""
+    return {
+        "id": str(uuid.UUID(int=total - index)),
+        "date": (END_DATE - timedelta(days=index // EXPENSES_PER_DAY)).isoformat(),
+        "description": f"Expense {index}",
+        "amount": round(5 + index % 200 * 0.37, 2),
+        "payment_method": "card",
+        "category": {"name": "Groceries"},
+    }
+
+
+async def make_client(total: int):
+    """Supabase client over a fake PostgREST that returns at most MAX_ROWS."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        query = unquote(str(request.url.query))
+        limit = int(re.search(r"limit=(\d+)", query).group(1))
+        cursor = re.search(r"id\.lt\.([0-9a-f-]+)", query)
+        start = total - uuid.UUID(cursor.group(1)).int + 1 if cursor else 0
+        stop = min(start + min(limit, MAX_ROWS), total)
+        return httpx.Response(200, json=[make_row(i, total) for i in range(start, stop)])
+
+    return await acreate_client(
+        "https://test.supabase.co",
+        "test-key" * 5,
+        options=AsyncClientOptions(
+            httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        ),
+    )
+
+
+@pytest.fixture(autouse=True)
+def export_page_size(monkeypatch):
+    monkeypatch.setattr(get_settings(), "export_page_size", PAGE_SIZE)
+
+
+async def read_descriptions(format: str, total: int) -> list[str]:
+    service = ReportService(await make_client(total))
+    start_date = (END_DATE - timedelta(days=total // EXPENSES_PER_DAY + 1)).isoformat()
+    if format == "csv":
+        chunks, _ = service.export_csv("test-user", start_date, END_DATE.isoformat())
+    else:
+        chunks, _ = service.export_columnar("test-user", start_date, END_DATE.isoformat(), format)
+    content = b"".join([chunk async for chunk in chunks])
+
+    if format == "csv":
+        rows = list(csv.DictReader(io.StringIO(content.decode("utf-8"))))
+        return [row["Description"] for row in rows]
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if format == "parquet":
+        table = pq.read_table(io.BytesIO(content))
+    else:
+        table = pa.ipc.open_stream(content).read_all()
+    return table.column("description").to_pylist()
+
+
+@pytest.mark.parametrize("format", ["csv", "parquet", "arrow"])
+@pytest.mark.parametrize("total", [0, 1, MAX_ROWS, 3 * MAX_ROWS + 7])
+async def test_export_returns_every_row(format, total):
+    if format != "csv":
+        pytest.importorskip("pyarrow")
+
+    descriptions = await read_descriptions(format, total)
+
+    assert descriptions == [f"Expense {i}" for i in range(total)]
@@ -11,10 +11,11 @@ export interface ApiError {
 
 export interface PaginatedResponse<T> {
   data: T[];
-  total: number;
+  total: number | null;
   page: number;
   limit: number;
-  total_pages: number;
+  total_pages: number | null;
+  next_cursor?: string | null;
 }
 
 export interface QueryParams {
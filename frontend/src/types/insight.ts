@@ -38,10 +38,14 @@ export interface ChatMessage {
 export interface SpendingPrediction {
   period: string;
   predicted_amount: number;
+  lower_bound?: number | null;
+  upper_bound?: number | null;
   confidence: number;
   breakdown: {
     category_id: string;
     category_name: string;
     predicted_amount: number;
+    lower_bound?: number | null;
+    upper_bound?: number | null;
   }[];
 }
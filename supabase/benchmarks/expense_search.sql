@@ -0,0 +1,42 @@
+-- Description search for GET /expenses?search=: ilike vs search_expenses().
+--
+-- Run against a development database with all migrations applied:
+--     psql "$DATABASE_URL" -f supabase/benchmarks/expense_search.sql
+--
+-- Seeds 1,000,000 expenses for a throwaway user inside a transaction that is
+-- rolled back at the end.
+BEGIN;
+
+INSERT INTO auth.users (id) VALUES ('00000000-0000-0000-0000-00000000beef');
+
+INSERT INTO expenses (user_id, category_id, amount, description, date, payment_method)
+SELECT
+    '00000000-0000-0000-0000-00000000beef',
+    (SELECT id FROM categories WHERE is_default AND type = 'expense' LIMIT 1),
+    (random() * 100 + 1)::numeric(12, 2),
+    (ARRAY['Groceries at', 'Coffee from', 'Lunch at', 'Fuel at', 'Tickets for'])[1 + g % 5]
+        || ' ' || (ARRAY['Starbucks', 'Walmart', 'Shell', 'Cinema', 'Deli'])[1 + (g / 5) % 5]
+        || ' #' || g,
+    CURRENT_DATE - (g / 1000),
+    'card'
+FROM generate_series(1, 1000000) g;
+
+ANALYZE expenses;
+
+\echo '--- ilike, page 1 with exact count'
+EXPLAIN (ANALYZE, COSTS OFF, SUMMARY ON)
+SELECT *, COUNT(*) OVER () FROM expenses
+WHERE user_id = '00000000-0000-0000-0000-00000000beef'
+    AND description ILIKE '%starbuck%'
+ORDER BY date DESC, id DESC
+LIMIT 20;
+
+\echo '--- search_expenses, prefix match'
+EXPLAIN (ANALYZE, COSTS OFF, SUMMARY ON)
+SELECT * FROM search_expenses('00000000-0000-0000-0000-00000000beef', 'starbuck cof');
+
+\echo '--- search_expenses, misspelled'
+EXPLAIN (ANALYZE, COSTS OFF, SUMMARY ON)
+SELECT * FROM search_expenses('00000000-0000-0000-0000-00000000beef', 'starbcks');
+
+ROLLBACK;
@@ -0,0 +1,61 @@
+-- Offset vs keyset pagination for GET /expenses, page 1 and page 500.
+--
+-- Run against a development database with all migrations applied:
+--     psql "$DATABASE_URL" -f supabase/benchmarks/expenses_pagination.sql
+--
+-- Seeds 20,000 expenses for a throwaway user inside a transaction that is
+-- rolled back at the end. The queries mirror what PostgREST generates.
+BEGIN;
+
+INSERT INTO auth.users (id) VALUES ('00000000-0000-0000-0000-00000000beef');
+
+INSERT INTO expenses (user_id, category_id, amount, description, date, payment_method)
+SELECT
+    '00000000-0000-0000-0000-00000000beef',
+    (SELECT id FROM categories WHERE is_default AND type = 'expense' LIMIT 1),
+    (random() * 100 + 1)::numeric(12, 2),
+    'Benchmark expense ' || g,
+    CURRENT_DATE - (g / 10),
+    'card'
+FROM generate_series(1, 20000) g;
+
+ANALYZE expenses;
+
+\echo '--- offset, page 1'
+EXPLAIN (ANALYZE, COSTS OFF, SUMMARY ON)
+SELECT * FROM expenses
+WHERE user_id = '00000000-0000-0000-0000-00000000beef'
+ORDER BY date DESC, id DESC
+LIMIT 20 OFFSET 0;
+
+\echo '--- offset, page 500'
+EXPLAIN (ANALYZE, COSTS OFF, SUMMARY ON)
+SELECT * FROM expenses
+WHERE user_id = '00000000-0000-0000-0000-00000000beef'
+ORDER BY date DESC, id DESC
+LIMIT 20 OFFSET 9980;
+
+-- Sort key of the last row on page 499, i.e. the cursor for page 500
+SELECT date AS cursor_date, id AS cursor_id
+FROM expenses
+WHERE user_id = '00000000-0000-0000-0000-00000000beef'
+ORDER BY date DESC, id DESC
+LIMIT 1 OFFSET 9979 \gset
+
+\echo '--- keyset, page 1'
+EXPLAIN (ANALYZE, COSTS OFF, SUMMARY ON)
+SELECT * FROM expenses
+WHERE user_id = '00000000-0000-0000-0000-00000000beef'
+ORDER BY date DESC, id DESC
+LIMIT 21;
+
+\echo '--- keyset, page 500'
+EXPLAIN (ANALYZE, COSTS OFF, SUMMARY ON)
+SELECT * FROM expenses
+WHERE user_id = '00000000-0000-0000-0000-00000000beef'
+    AND date <= :'cursor_date'
+    AND (date < :'cursor_date' OR (date = :'cursor_date' AND id < :'cursor_id'))
+ORDER BY date DESC, id DESC
+LIMIT 21;
+
+ROLLBACK;
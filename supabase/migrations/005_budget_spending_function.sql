@@ -0,0 +1,20 @@
+-- Spending for many budget windows in a single round trip.
+-- p_windows is a JSON array of
+--   {"budget_id": uuid, "category_id": uuid | null, "start_date": date, "end_date": date}
+-- A NULL category_id sums every expense in the window (overall budget).
+CREATE OR REPLACE FUNCTION public.get_budget_spending(p_user_id UUID, p_windows JSONB)
+RETURNS TABLE (budget_id UUID, spent NUMERIC)
+LANGUAGE sql STABLE
+AS $$
+    SELECT w.budget_id, COALESCE(SUM(e.amount), 0) AS spent
+    FROM jsonb_to_recordset(p_windows)
+        AS w(budget_id UUID, category_id UUID, start_date DATE, end_date DATE)
+    LEFT JOIN expenses e
+        ON e.user_id = p_user_id
+        AND e.date BETWEEN w.start_date AND w.end_date
+        AND (w.category_id IS NULL OR e.category_id = w.category_id)
+    GROUP BY w.budget_id;
+$$;
+
+-- Composite index for per-user date range scans
+CREATE INDEX IF NOT EXISTS idx_expenses_user_date ON expenses(user_id, date);
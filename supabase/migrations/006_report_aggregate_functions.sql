@@ -0,0 +1,51 @@
+-- Server-side aggregates for the monthly and category reports, so the API
+-- transfers one row per month/category instead of every expense row.
+
+CREATE OR REPLACE FUNCTION public.get_monthly_spending(
+    p_user_id UUID,
+    p_start_date DATE,
+    p_end_date DATE
+)
+RETURNS TABLE (month TEXT, total_spent NUMERIC, transaction_count BIGINT)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        to_char(e.date, 'YYYY-MM') AS month,
+        SUM(e.amount) AS total_spent,
+        COUNT(*) AS transaction_count
+    FROM expenses e
+    WHERE e.user_id = p_user_id
+        AND e.date BETWEEN p_start_date AND p_end_date
+    GROUP BY 1
+    ORDER BY 1;
+$$;
+
+CREATE OR REPLACE FUNCTION public.get_category_spending(
+    p_user_id UUID,
+    p_start_date DATE,
+    p_end_date DATE
+)
+RETURNS TABLE (
+    category_id UUID,
+    category_name TEXT,
+    category_color TEXT,
+    category_icon TEXT,
+    total_amount NUMERIC,
+    transaction_count BIGINT
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        e.category_id,
+        c.name AS category_name,
+        c.color AS category_color,
+        c.icon AS category_icon,
+        SUM(e.amount) AS total_amount,
+        COUNT(*) AS transaction_count
+    FROM expenses e
+    LEFT JOIN categories c ON c.id = e.category_id
+    WHERE e.user_id = p_user_id
+        AND e.date BETWEEN p_start_date AND p_end_date
+    GROUP BY e.category_id, c.name, c.color, c.icon
+    ORDER BY total_amount DESC;
+$$;
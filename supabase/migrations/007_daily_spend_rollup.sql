@@ -0,0 +1,271 @@
+-- Daily spending rollup keyed by (user_id, date, category_id).
+-- Kept in sync with expenses by statement-level triggers, so bulk writes
+-- update each rollup row once per statement instead of once per expense.
+CREATE TABLE IF NOT EXISTS daily_spend (
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    date DATE NOT NULL,
+    category_id UUID NOT NULL REFERENCES categories(id),
+    total DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, date, category_id)
+);
+
+ALTER TABLE daily_spend ENABLE ROW LEVEL SECURITY;
+
+-- Read-only for users; rows are written by the trigger function only
+CREATE POLICY "Users can view own daily spend" ON daily_spend
+    FOR SELECT USING (auth.uid() = user_id);
+
+-- Per-user transaction lock shared by the trigger and rebuild_daily_spend,
+-- so a rebuild only waits for (and blocks) writes of the user it rebuilds
+CREATE OR REPLACE FUNCTION public.lock_daily_spend(p_user_id UUID)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    SELECT pg_advisory_xact_lock(hashtext('daily_spend:' || p_user_id::text));
+$$;
+
+-- Apply the net change of one expenses statement to the rollup
+CREATE OR REPLACE FUNCTION public.maintain_daily_spend()
+RETURNS TRIGGER
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = public
+AS $$
+BEGIN
+    -- Lock every affected user, in a fixed order to avoid deadlocks
+    IF TG_OP = 'INSERT' THEN
+        PERFORM lock_daily_spend(u.user_id)
+        FROM (SELECT DISTINCT user_id FROM new_rows ORDER BY user_id) u;
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM lock_daily_spend(u.user_id)
+        FROM (SELECT DISTINCT user_id FROM old_rows ORDER BY user_id) u;
+    ELSE
+        PERFORM lock_daily_spend(u.user_id)
+        FROM (
+            SELECT user_id FROM old_rows UNION SELECT user_id FROM new_rows ORDER BY user_id
+        ) u;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO daily_spend (user_id, date, category_id, total, transaction_count)
+        SELECT user_id, date, category_id, -SUM(amount), -COUNT(*)
+        FROM old_rows
+        GROUP BY user_id, date, category_id
+        ON CONFLICT (user_id, date, category_id) DO UPDATE SET
+            total = daily_spend.total + EXCLUDED.total,
+            transaction_count = daily_spend.transaction_count + EXCLUDED.transaction_count;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO daily_spend (user_id, date, category_id, total, transaction_count)
+        SELECT user_id, date, category_id, SUM(amount), COUNT(*)
+        FROM new_rows
+        GROUP BY user_id, date, category_id
+        ON CONFLICT (user_id, date, category_id) DO UPDATE SET
+            total = daily_spend.total + EXCLUDED.total,
+            transaction_count = daily_spend.transaction_count + EXCLUDED.transaction_count;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        -- Drop days/categories that no longer have any expenses
+        DELETE FROM daily_spend d
+        USING old_rows o
+        WHERE d.user_id = o.user_id
+            AND d.date = o.date
+            AND d.category_id = o.category_id
+            AND d.transaction_count = 0;
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS daily_spend_on_insert ON expenses;
+CREATE TRIGGER daily_spend_on_insert
+    AFTER INSERT ON expenses
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.maintain_daily_spend();
+
+DROP TRIGGER IF EXISTS daily_spend_on_update ON expenses;
+CREATE TRIGGER daily_spend_on_update
+    AFTER UPDATE ON expenses
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.maintain_daily_spend();
+
+DROP TRIGGER IF EXISTS daily_spend_on_delete ON expenses;
+CREATE TRIGGER daily_spend_on_delete
+    AFTER DELETE ON expenses
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.maintain_daily_spend();
+
+-- Rollup rows that disagree with the raw expenses for a user
+CREATE OR REPLACE FUNCTION public.check_daily_spend(p_user_id UUID)
+RETURNS TABLE (
+    date DATE,
+    category_id UUID,
+    rollup_total NUMERIC,
+    actual_total NUMERIC,
+    rollup_count BIGINT,
+    actual_count BIGINT
+)
+LANGUAGE sql STABLE
+AS $$
+    WITH actual AS (
+        SELECT e.date, e.category_id, SUM(e.amount) AS total, COUNT(*) AS transaction_count
+        FROM expenses e
+        WHERE e.user_id = p_user_id
+        GROUP BY e.date, e.category_id
+    ),
+    rollup AS (
+        SELECT d.date, d.category_id, d.total, d.transaction_count::BIGINT AS transaction_count
+        FROM daily_spend d
+        WHERE d.user_id = p_user_id
+    )
+    SELECT
+        COALESCE(a.date, r.date),
+        COALESCE(a.category_id, r.category_id),
+        r.total,
+        a.total,
+        r.transaction_count,
+        a.transaction_count
+    FROM actual a
+    FULL OUTER JOIN rollup r ON r.date = a.date AND r.category_id = a.category_id
+    WHERE a.total IS DISTINCT FROM r.total
+        OR a.transaction_count IS DISTINCT FROM r.transaction_count
+    ORDER BY 1, 2;
+$$;
+
+-- Recompute a user's rollup from raw expenses; returns the rows written
+CREATE OR REPLACE FUNCTION public.rebuild_daily_spend(p_user_id UUID)
+RETURNS INTEGER
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = public
+AS $$
+DECLARE
+    rebuilt INTEGER;
+BEGIN
+    -- Wait for this user's in-flight expense writes and hold off new ones
+    -- until commit; the statements below then see every committed expense
+    PERFORM lock_daily_spend(p_user_id);
+
+    DELETE FROM daily_spend WHERE user_id = p_user_id;
+
+    INSERT INTO daily_spend (user_id, date, category_id, total, transaction_count)
+    SELECT user_id, date, category_id, SUM(amount), COUNT(*)
+    FROM expenses
+    WHERE user_id = p_user_id
+    GROUP BY user_id, date, category_id;
+
+    GET DIAGNOSTICS rebuilt = ROW_COUNT;
+    RETURN rebuilt;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.rebuild_daily_spend(UUID) FROM PUBLIC, anon, authenticated;
+
+-- Backfill from existing expenses
+INSERT INTO daily_spend (user_id, date, category_id, total, transaction_count)
+SELECT user_id, date, category_id, SUM(amount), COUNT(*)
+FROM expenses
+GROUP BY user_id, date, category_id
+ON CONFLICT (user_id, date, category_id) DO NOTHING;
+
+-- Aggregates can now be served from the rollup (p_use_rollup) or raw rows.
+-- The signatures change, so drop the old versions to avoid ambiguous overloads.
+DROP FUNCTION IF EXISTS public.get_budget_spending(UUID, JSONB);
+DROP FUNCTION IF EXISTS public.get_monthly_spending(UUID, DATE, DATE);
+DROP FUNCTION IF EXISTS public.get_category_spending(UUID, DATE, DATE);
+
+CREATE FUNCTION public.get_budget_spending(
+    p_user_id UUID,
+    p_windows JSONB,
+    p_use_rollup BOOLEAN DEFAULT FALSE
+)
+RETURNS TABLE (budget_id UUID, spent NUMERIC)
+LANGUAGE sql STABLE
+AS $$
+    SELECT w.budget_id, COALESCE(SUM(s.total), 0) AS spent
+    FROM jsonb_to_recordset(p_windows)
+        AS w(budget_id UUID, category_id UUID, start_date DATE, end_date DATE)
+    LEFT JOIN (
+        SELECT e.date, e.category_id, e.amount AS total
+        FROM expenses e
+        WHERE NOT p_use_rollup AND e.user_id = p_user_id
+        UNION ALL
+        SELECT d.date, d.category_id, d.total
+        FROM daily_spend d
+        WHERE p_use_rollup AND d.user_id = p_user_id
+    ) s
+        ON s.date BETWEEN w.start_date AND w.end_date
+        AND (w.category_id IS NULL OR s.category_id = w.category_id)
+    GROUP BY w.budget_id;
+$$;
+
+CREATE FUNCTION public.get_monthly_spending(
+    p_user_id UUID,
+    p_start_date DATE,
+    p_end_date DATE,
+    p_use_rollup BOOLEAN DEFAULT FALSE
+)
+RETURNS TABLE (month TEXT, total_spent NUMERIC, transaction_count BIGINT)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        to_char(s.date, 'YYYY-MM') AS month,
+        SUM(s.total) AS total_spent,
+        SUM(s.transaction_count)::BIGINT AS transaction_count
+    FROM (
+        SELECT e.date, e.amount AS total, 1 AS transaction_count
+        FROM expenses e
+        WHERE NOT p_use_rollup
+            AND e.user_id = p_user_id
+            AND e.date BETWEEN p_start_date AND p_end_date
+        UNION ALL
+        SELECT d.date, d.total, d.transaction_count
+        FROM daily_spend d
+        WHERE p_use_rollup
+            AND d.user_id = p_user_id
+            AND d.date BETWEEN p_start_date AND p_end_date
+    ) s
+    GROUP BY 1
+    ORDER BY 1;
+$$;
+
+CREATE FUNCTION public.get_category_spending(
+    p_user_id UUID,
+    p_start_date DATE,
+    p_end_date DATE,
+    p_use_rollup BOOLEAN DEFAULT FALSE
+)
+RETURNS TABLE (
+    category_id UUID,
+    category_name TEXT,
+    category_color TEXT,
+    category_icon TEXT,
+    total_amount NUMERIC,
+    transaction_count BIGINT
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        s.category_id,
+        c.name AS category_name,
+        c.color AS category_color,
+        c.icon AS category_icon,
+        SUM(s.total) AS total_amount,
+        SUM(s.transaction_count)::BIGINT AS transaction_count
+    FROM (
+        SELECT e.category_id, e.amount AS total, 1 AS transaction_count
+        FROM expenses e
+        WHERE NOT p_use_rollup
+            AND e.user_id = p_user_id
+            AND e.date BETWEEN p_start_date AND p_end_date
+        UNION ALL
+        SELECT d.category_id, d.total, d.transaction_count
+        FROM daily_spend d
+        WHERE p_use_rollup
+            AND d.user_id = p_user_id
+            AND d.date BETWEEN p_start_date AND p_end_date
+    ) s
+    LEFT JOIN categories c ON c.id = s.category_id
+    GROUP BY s.category_id, c.name, c.color, c.icon
+    ORDER BY total_amount DESC;
+$$;
@@ -0,0 +1,7 @@
+-- Index matching the expenses list order (date DESC, id DESC) per user, so
+-- keyset pagination can seek straight to the cursor. It also covers the
+-- (user_id, date) range scans, which makes the index from 005 redundant.
+CREATE INDEX IF NOT EXISTS idx_expenses_user_date_id
+    ON expenses(user_id, date DESC, id DESC);
+
+DROP INDEX IF EXISTS idx_expenses_user_date;
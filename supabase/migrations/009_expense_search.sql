@@ -0,0 +1,88 @@
+-- Indexed search over expense descriptions: full-text with prefix matching
+-- plus trigram word similarity for typos, ranked by relevance.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- An expression index rather than a stored tsvector column, so expense
+-- rows (and every `*` select of them) stay the size they were. Queries
+-- must use the same to_tsvector('english', description) expression.
+CREATE INDEX IF NOT EXISTS idx_expenses_description_tsv
+    ON expenses USING GIN (to_tsvector('english', description));
+
+CREATE INDEX IF NOT EXISTS idx_expenses_description_trgm
+    ON expenses USING GIN (description gin_trgm_ops);
+
+-- Returns expense rows shaped like the list endpoint (category embedded as
+-- JSON) plus a relevance rank and the total number of matches.
+CREATE OR REPLACE FUNCTION public.search_expenses(
+    p_user_id UUID,
+    p_query TEXT,
+    p_limit INTEGER DEFAULT 20,
+    p_offset INTEGER DEFAULT 0,
+    p_start_date DATE DEFAULT NULL,
+    p_end_date DATE DEFAULT NULL,
+    p_category_id UUID DEFAULT NULL,
+    p_min_amount NUMERIC DEFAULT NULL,
+    p_max_amount NUMERIC DEFAULT NULL,
+    p_payment_method TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    user_id UUID,
+    category_id UUID,
+    amount NUMERIC,
+    description TEXT,
+    date DATE,
+    payment_method TEXT,
+    receipt_url TEXT,
+    created_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ,
+    category JSONB,
+    rank REAL,
+    total_count BIGINT
+)
+LANGUAGE sql STABLE
+AS $$
+    WITH search AS (
+        -- Every word becomes a prefix term: "star cof" matches "Starbucks coffee"
+        SELECT to_tsquery('english', string_agg(word || ':*', ' & ')) AS query
+        FROM regexp_split_to_table(lower(p_query), '[^[:alnum:]]+') AS word
+        WHERE word <> ''
+    ),
+    matches AS (
+        SELECT
+            e.*,
+            GREATEST(
+                ts_rank(to_tsvector('english', e.description), s.query),
+                word_similarity(p_query, e.description)
+            ) AS rank
+        FROM expenses e, search s
+        WHERE e.user_id = p_user_id
+            AND (to_tsvector('english', e.description) @@ s.query OR p_query <% e.description)
+            AND (p_start_date IS NULL OR e.date >= p_start_date)
+            AND (p_end_date IS NULL OR e.date <= p_end_date)
+            AND (p_category_id IS NULL OR e.category_id = p_category_id)
+            AND (p_min_amount IS NULL OR e.amount >= p_min_amount)
+            AND (p_max_amount IS NULL OR e.amount <= p_max_amount)
+            AND (p_payment_method IS NULL OR e.payment_method = p_payment_method)
+    )
+    SELECT
+        m.id,
+        m.user_id,
+        m.category_id,
+        m.amount,
+        m.description,
+        m.date,
+        m.payment_method,
+        m.receipt_url,
+        m.created_at,
+        m.updated_at,
+        CASE WHEN c.id IS NULL THEN NULL ELSE
+            jsonb_build_object('id', c.id, 'name', c.name, 'icon', c.icon, 'color', c.color)
+        END AS category,
+        m.rank,
+        COUNT(*) OVER () AS total_count
+    FROM matches m
+    LEFT JOIN categories c ON c.id = m.category_id
+    ORDER BY m.rank DESC, m.date DESC, m.id DESC
+    LIMIT p_limit OFFSET p_offset;
+$$;
@@ -0,0 +1,27 @@
+-- Total spent by a user in a date range, as a single number. The spending
+-- summary compares against the previous period's total only, so there is
+-- no need to transfer that period's expense rows.
+CREATE OR REPLACE FUNCTION public.get_spending_total(
+    p_user_id UUID,
+    p_start_date DATE,
+    p_end_date DATE,
+    p_use_rollup BOOLEAN DEFAULT FALSE
+)
+RETURNS NUMERIC
+LANGUAGE sql STABLE
+AS $$
+    SELECT COALESCE(SUM(s.total), 0)
+    FROM (
+        SELECT e.amount AS total
+        FROM expenses e
+        WHERE NOT p_use_rollup
+            AND e.user_id = p_user_id
+            AND e.date BETWEEN p_start_date AND p_end_date
+        UNION ALL
+        SELECT d.total
+        FROM daily_spend d
+        WHERE p_use_rollup
+            AND d.user_id = p_user_id
+            AND d.date BETWEEN p_start_date AND p_end_date
+    ) s;
+$$;